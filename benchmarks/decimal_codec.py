@@ -0,0 +1,124 @@
+"""Decimal <-> Decimal128 conversions: pymongo codec vs the previous document walks
+
+    python benchmarks/decimal_codec.py [--number 5000]
+
+Compares, per value and per document of 40 Decimal fields:
+  old:    convert_decimal_to_d128 / convert_d128_to_decimal as they were,
+          a Decimal128 context per value, string conversion and to_decimal()
+  walk:   the same document walks using to_decimal128 / from_decimal128
+  codec:  bson encode / decode with DECIMAL_CODEC_OPTIONS, no walk at all
+"""
+import argparse
+import os
+import sys
+import timeit
+from decimal import Decimal, localcontext
+
+import bson
+from bson.decimal128 import Decimal128, create_decimal128_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sources.common.database.common.codecs import (
+    DECIMAL_CODEC_OPTIONS,
+    from_decimal128,
+    to_decimal128,
+)
+from sources.web3.bins.database.common.db_collections_common import (
+    db_collections_common,
+)
+
+DOCUMENT = {
+    "id": "0x01_17000000_100_0x02",
+    "address": "0x" + "1" * 40,
+    "block": 17000000,
+    "timestamp": 1680000000,
+    "topic": "deposit",
+    **{f"field_{i}": Decimal(f"{i}.123456789012345678") for i in range(30)},
+    "position": {f"field_{i}": Decimal(f"-{i}.98765432101") for i in range(10)},
+}
+VALUE = Decimal("115792089237316195423570985008687.907853269984665640564")
+
+
+def old_to_decimal128(value: Decimal) -> Decimal128:
+    with localcontext(create_decimal128_context()) as ctx:
+        return Decimal128(ctx.create_decimal(str(value)))
+
+
+def old_convert_decimal_to_d128(item: dict) -> dict:
+    for k, v in list(item.items()):
+        if isinstance(v, dict):
+            old_convert_decimal_to_d128(v)
+        elif isinstance(v, list):
+            for l in v:
+                old_convert_decimal_to_d128(l)
+        elif isinstance(v, Decimal):
+            item[k] = old_to_decimal128(v)
+    return item
+
+
+def old_convert_d128_to_decimal(item: dict) -> dict:
+    for k, v in list(item.items()):
+        if isinstance(v, dict):
+            old_convert_d128_to_decimal(v)
+        elif isinstance(v, list):
+            for l in v:
+                old_convert_d128_to_decimal(l)
+        elif isinstance(v, Decimal128):
+            item[k] = v.to_decimal()
+    return item
+
+
+def document_copy() -> dict:
+    # the walks convert in place
+    return DOCUMENT | {"position": dict(DOCUMENT["position"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    number = parser.parse_args().number
+
+    d128 = to_decimal128(VALUE)
+    encoded = bson.encode(old_convert_decimal_to_d128(document_copy()))
+
+    # all the conversions agree
+    assert old_to_decimal128(VALUE).bid == d128.bid
+    assert from_decimal128(d128) == d128.to_decimal()
+    assert bson.encode(DOCUMENT, codec_options=DECIMAL_CODEC_OPTIONS) == encoded
+    assert bson.decode(encoded, codec_options=DECIMAL_CODEC_OPTIONS) == DOCUMENT
+    assert db_collections_common.convert_d128_to_decimal(bson.decode(encoded)) == (
+        DOCUMENT
+    )
+
+    cases = {
+        "value   Decimal -> Decimal128  old": lambda: old_to_decimal128(VALUE),
+        "value   Decimal -> Decimal128  new": lambda: to_decimal128(VALUE),
+        "value   Decimal128 -> Decimal  old": d128.to_decimal,
+        "value   Decimal128 -> Decimal  new": lambda: from_decimal128(d128),
+        "write   old walk + encode": lambda: bson.encode(
+            old_convert_decimal_to_d128(document_copy())
+        ),
+        "write   walk + encode": lambda: bson.encode(
+            db_collections_common.convert_decimal_to_d128(document_copy())
+        ),
+        "write   codec encode": lambda: bson.encode(
+            DOCUMENT, codec_options=DECIMAL_CODEC_OPTIONS
+        ),
+        "read    decode + old walk": lambda: old_convert_d128_to_decimal(
+            bson.decode(encoded)
+        ),
+        "read    decode + walk": lambda: db_collections_common.convert_d128_to_decimal(
+            bson.decode(encoded)
+        ),
+        "read    codec decode": lambda: bson.decode(
+            encoded, codec_options=DECIMAL_CODEC_OPTIONS
+        ),
+    }
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:<40} {seconds / number * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Concurrent database reads: shared client + thread pool vs a client per call
+
+Runs <requests> concurrent aggregate queries against a fake MongoClient that
+blocks like pymongo does ( client creation, index setup and the query itself ),
+while a ping task measures how long the event loop takes to serve a request
+that does not use the database.
+
+    python benchmarks/mongo_pool.py [--requests 100] [--query-ms 50]
+
+per-call:  the previous behaviour, a MongoClient created, configured and
+           queried per call, directly in the event loop.
+pooled:    db_collections_common.query_items_from_database, using the process
+           wide client and the mongo thread pool ( mongo_pool ).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sources.common.database.common.db_managers as db_managers
+from sources.subgraph.bins.database.managers import db_returns_manager
+
+CLIENT_MS = 10
+INDEX_MS = 2
+QUERY_MS = 50
+
+
+class FakeCollection:
+    def create_index(self, field, unique=False):
+        time.sleep(INDEX_MS / 1000)
+
+    def aggregate(self, pipeline, **kwargs):
+        # server side aggregation + network wait
+        time.sleep(QUERY_MS / 1000)
+        return iter([{"id": 1}])
+
+
+class FakeDatabase:
+    name = "gamma"
+
+    def __getitem__(self, name):
+        return FakeCollection()
+
+
+class FakeClient:
+    def __init__(self, url, **kwargs):
+        time.sleep(CLIENT_MS / 1000)
+
+    def get_database(self, name, **kwargs):
+        return FakeDatabase()
+
+    def close(self):
+        pass
+
+
+def per_call_query(manager: db_returns_manager, query: list[dict], coll: str):
+    """Previous query_items_from_database: new client and index setup per call"""
+    client = FakeClient(manager._db_mongo_url)
+    database = client.get_database(manager._db_name)
+    for coll_name, fields in manager._db_collections.items():
+        for field, unique in fields.items():
+            database[coll_name].create_index(field, unique=unique)
+    try:
+        return list(database[coll].aggregate(query))
+    finally:
+        client.close()
+
+
+async def request(mode: str) -> list:
+    manager = db_returns_manager(mongo_url="mongodb://benchmark")
+    if mode == "per-call":
+        return per_call_query(manager, [], "returns")
+    return await manager.query_items_from_database([], "returns")
+
+
+async def ping(latencies: list[float]):
+    # a request that does not touch the database, i.e. a cached endpoint
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - start - 0.001)
+
+
+async def run(mode: str, requests: int):
+    # warm up: client creation and index setup
+    await request(mode)
+
+    latencies = []
+    pinger = asyncio.create_task(ping(latencies))
+    start = time.perf_counter()
+    await asyncio.gather(*[request(mode) for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    pinger.cancel()
+
+    latencies = sorted(latencies) or [elapsed]
+    print(
+        f"{mode:>8}: {requests} concurrent queries in {elapsed:.2f}s -> {requests / elapsed:.0f} req/s;"
+        f" other requests latency p50 {latencies[len(latencies) // 2] * 1000:.1f}ms max {latencies[-1] * 1000:.0f}ms"
+    )
+
+
+def main():
+    global QUERY_MS
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--query-ms", type=int, default=QUERY_MS)
+    args = parser.parse_args()
+    QUERY_MS = args.query_ms
+
+    db_managers.MongoClient = FakeClient
+    for mode in ("per-call", "pooled"):
+        asyncio.run(run(mode, args.requests))
+    db_managers.mongo_pool.close()
+
+
+if __name__ == "__main__":
+    main()
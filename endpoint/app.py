@@ -2,6 +2,9 @@ import logging
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from endpoint.cache import endpoint_cache
+from endpoint.warmer import cache_warmer
+
 from sources.subgraph.enpoint.app import create_app as create_subgraph_endpoint
 from sources.web3.endpoint.app import create_app as create_web3_endpoint
 from sources.mongo.endpoint.app import create_app as create_mongo_endpoint
@@ -22,6 +25,19 @@ app.add_middleware(
     CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
 )
 
+
+@app.get("/cache/metrics", tags=["Cache"])
+async def cache_metrics():
+    """Endpoint cache hits, stale hits, misses and refreshes per function"""
+    return endpoint_cache.metrics()
+
+
+@app.get("/cache/health", tags=["Cache"])
+async def cache_health():
+    """Cache warmer state and last warm time per warmed endpoint"""
+    return {"warmerRunning": cache_warmer.running, "targets": cache_warmer.status()}
+
+
 # Create subgraph endpoint
 app.mount(
     path="/subgraph",
@@ -0,0 +1,543 @@
+import asyncio
+import gzip
+import hashlib
+import inspect
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from endpoint.config.cache import (
+    CACHE_BACKEND,
+    CACHE_GZIP_MIN_SIZE,
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_STALE,
+    CACHE_REFRESH_LEASE,
+    CACHE_SQLITE_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+# how often a worker checks for a result another worker is computing
+LEASE_POLL_INTERVAL = 0.2
+
+
+@dataclass
+class CacheMetrics:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+
+@dataclass
+class CacheEntry:
+    """Serialized result, timestamps are wall clock so workers can share them"""
+
+    body: bytes
+    gzip_body: bytes | None
+    etag: str
+    created: float
+    expire: int
+    max_stale: int
+
+    @classmethod
+    def from_body(cls, body: bytes, expire: int, max_stale: int) -> "CacheEntry":
+        return cls(
+            body=body,
+            gzip_body=(
+                gzip.compress(body, compresslevel=6)
+                if len(body) >= CACHE_GZIP_MIN_SIZE
+                else None
+            ),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            created=time.time(),
+            expire=expire,
+            max_stale=max_stale,
+        )
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.expire
+
+    @property
+    def usable(self) -> bool:
+        return self.age < self.expire + self.max_stale
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> CacheEntry | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        pass
+
+    @abstractmethod
+    async def acquire(self, key: str, lease: int) -> bool:
+        """Claim the refresh of key for lease seconds, False if claimed elsewhere"""
+
+    @abstractmethod
+    async def release(self, key: str) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per process store, refreshes are already deduplicated in process"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[str, CacheEntry] = {}
+
+    async def get(self, key: str) -> CacheEntry | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        if len(self._entries) <= self.max_entries:
+            return
+
+        # drop unusable entries first, then the oldest ones
+        self._entries = {
+            entry_key: entry
+            for entry_key, entry in self._entries.items()
+            if entry.usable
+        }
+        oldest = sorted(
+            self._entries, key=lambda entry_key: self._entries[entry_key].created
+        )
+        for entry_key in oldest[: len(self._entries) - self.max_entries]:
+            del self._entries[entry_key]
+
+    async def acquire(self, key: str, lease: int) -> bool:
+        return True
+
+    async def release(self, key: str) -> None:
+        pass
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Store shared by all workers on the host through a SQLite file
+
+    Refresh leases live in the same file, so an expired result is recomputed
+    by one worker and served to all of them.
+    """
+
+    def __init__(self, path: str, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # gunicorn forks workers, each process needs its own connection
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=10, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, body BLOB, gzip_body BLOB, etag TEXT, "
+                "created REAL, expire INTEGER, max_stale INTEGER)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, until REAL)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            cursor = self._connect().execute(sql, parameters)
+            return cursor.fetchall() if cursor.description else [cursor.rowcount]
+
+    def _get(self, key: str) -> CacheEntry | None:
+        rows = self._execute(
+            "SELECT body, gzip_body, etag, created, expire, max_stale "
+            "FROM entries WHERE key = ?",
+            (key,),
+        )
+        return CacheEntry(*rows[0]) if rows else None
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                entry.body,
+                entry.gzip_body,
+                entry.etag,
+                entry.created,
+                entry.expire,
+                entry.max_stale,
+            ),
+        )
+        [(count,)] = self._execute("SELECT COUNT(*) FROM entries")
+        if count <= self.max_entries:
+            return
+
+        # drop unusable entries first, then the oldest ones
+        self._execute(
+            "DELETE FROM entries WHERE created + expire + max_stale < ?",
+            (time.time(),),
+        )
+        self._execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+            "ORDER BY created LIMIT max(0, (SELECT COUNT(*) FROM entries) - ?))",
+            (self.max_entries,),
+        )
+
+    def _acquire(self, key: str, lease: int) -> bool:
+        now = time.time()
+        [rowcount] = self._execute(
+            "INSERT INTO leases VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET until = excluded.until "
+            "WHERE leases.until < ?",
+            (key, now + lease, now),
+        )
+        return rowcount == 1
+
+    def _release(self, key: str) -> None:
+        self._execute("DELETE FROM leases WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> CacheEntry | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    async def acquire(self, key: str, lease: int) -> bool:
+        return await asyncio.to_thread(self._acquire, key, lease)
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._release, key)
+
+
+def create_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "sqlite":
+        path = CACHE_SQLITE_PATH or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+            "gamma_endpoint_cache.sqlite",
+        )
+        return SQLiteCacheBackend(path)
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+def serialize(value: Any) -> bytes:
+    """JSON body as FastAPI would send it"""
+    return JSONResponse(content=jsonable_encoder(value)).body
+
+
+class StaleWhileRevalidateCache:
+    """Endpoint cache of serialized results
+
+    Results are served from cache while fresh. Once expired they are still
+    served, up to max_stale seconds, while a single background task refreshes
+    them. Only callers finding no usable entry wait for the computation, and
+    concurrent callers of the same key share it, across workers when the
+    backend is shared.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None) -> None:
+        self.backend = backend or create_backend()
+        # running refresh of each key, and whether it waits for other workers
+        self._refreshing: dict[str, tuple[asyncio.Task, bool]] = {}
+        self._metrics: dict[str, CacheMetrics] = {}
+
+    async def get(
+        self,
+        name: str,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        expire: int,
+        max_stale: int = CACHE_MAX_STALE,
+    ) -> CacheEntry | Response:
+        """Cached entry of func
+
+        Args:
+            name: metrics are grouped by name (i.e. endpoint function)
+            key: identifies the cached result
+            func: coroutine function computing the result
+            expire: seconds the result is fresh
+            max_stale: seconds past expire the result is still served while refreshing
+
+        Returns:
+            cache entry, or the Response returned by func which is not cached
+        """
+        metrics = self._metrics.setdefault(name, CacheMetrics())
+        entry = await self.backend.get(key)
+
+        if entry and entry.fresh:
+            metrics.hits += 1
+            return entry
+
+        if entry and entry.usable:
+            metrics.stale_hits += 1
+            self._refresh(name, key, func, expire, max_stale, wait=False)
+            return entry
+
+        metrics.misses += 1
+        # shield so a cancelled request does not cancel the refresh for the others
+        return await asyncio.shield(
+            self._refresh(name, key, func, expire, max_stale, wait=True)
+        )
+
+    async def warm(
+        self,
+        name: str,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        expire: int,
+        max_stale: int = CACHE_MAX_STALE,
+        lead: int = 0,
+    ) -> CacheEntry | Response | None:
+        """Refresh the entry of func unless it stays fresh for more than lead seconds
+
+        Returns:
+            current cache entry, or the Response returned by func which is not cached
+        """
+        self._metrics.setdefault(name, CacheMetrics())
+        entry = await self.backend.get(key)
+        if entry and entry.expire - entry.age > lead:
+            return entry
+
+        return await asyncio.shield(
+            self._refresh(name, key, func, expire, max_stale, wait=True)
+        )
+
+    def metrics(self) -> dict[str, dict]:
+        return {name: asdict(metrics) for name, metrics in self._metrics.items()}
+
+    def _refresh(
+        self,
+        name: str,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        expire: int,
+        max_stale: int,
+        wait: bool,
+    ) -> asyncio.Task:
+        task, waits = self._refreshing.get(key, (None, False))
+        # background refreshes give up when another worker holds the lease,
+        # so waiting callers do not join them but follow them with a waiting one
+        if task is None or (wait and not waits):
+            task = asyncio.create_task(
+                self._compute(name, key, func, expire, max_stale, wait, task)
+            )
+            # background refreshes are not awaited, errors are already logged
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._refreshing[key] = (task, wait)
+        return task
+
+    async def _compute(
+        self,
+        name: str,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        expire: int,
+        max_stale: int,
+        wait: bool,
+        background: asyncio.Task | None = None,
+    ) -> CacheEntry | Response | None:
+        try:
+            if background:
+                # use its result unless it gave up or failed
+                await asyncio.wait([background])
+                if not background.cancelled() and not background.exception():
+                    if (result := background.result()) is not None:
+                        return result
+
+            while not await self.backend.acquire(key, CACHE_REFRESH_LEASE):
+                # another worker is refreshing, stale callers keep the current entry
+                if not wait:
+                    return None
+                await asyncio.sleep(LEASE_POLL_INTERVAL)
+                entry = await self.backend.get(key)
+                if entry and entry.usable:
+                    return entry
+
+            try:
+                self._metrics[name].refreshes += 1
+                value = await func()
+                # responses built by the endpoint itself (i.e. errors) are not cached
+                if isinstance(value, Response):
+                    return value
+
+                entry = CacheEntry.from_body(serialize(value), expire, max_stale)
+                await self.backend.set(key, entry)
+                return entry
+            finally:
+                await self.backend.release(key)
+        except Exception:
+            self._metrics[name].refresh_errors += 1
+            logger.exception(f" Error refreshing {name} cache")
+            raise
+        finally:
+            if self._refreshing.get(key, (None, False))[0] is asyncio.current_task():
+                del self._refreshing[key]
+
+
+endpoint_cache = StaleWhileRevalidateCache()
+
+
+def _key_part(value: Any) -> Hashable:
+    # router builders are identified by the deployment they serve, so the same
+    # endpoint under different route prefixes shares its cache entry
+    if hasattr(value, "prefix") and hasattr(value, "tags"):
+        return (getattr(value, "dex", None), getattr(value, "chain", None))
+    return repr(value)
+
+
+def _cache_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    key = (
+        func.__module__,
+        func.__qualname__,
+        tuple(
+            _key_part(arg) for arg in args if not isinstance(arg, (Request, Response))
+        ),
+        tuple(
+            (param, _key_part(value))
+            for param, value in sorted(kwargs.items())
+            if not isinstance(value, (Request, Response))
+        ),
+    )
+    # stable across workers sharing the backend
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _response(entry: CacheEntry, request: Request | None) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"max-age={max(int(entry.expire - entry.age), 0)}, "
+        f"stale-while-revalidate={entry.max_stale}",
+        "Vary": "Accept-Encoding",
+    }
+    if request is None:
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or entry.etag in [
+        etag.strip().removeprefix("W/") for etag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers=headers)
+
+    if entry.gzip_body and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=entry.gzip_body, media_type="application/json", headers=headers
+        )
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _with_request(func: Callable) -> tuple[inspect.Signature, str | None]:
+    """Signature of func with a Request parameter, and the name of the one added"""
+    signature = inspect.signature(func)
+    if any(param.annotation is Request for param in signature.parameters.values()):
+        return signature, None
+
+    params = list(signature.parameters.values())
+    # keyword only parameters go before **kwargs
+    position = next(
+        (
+            index
+            for index, param in enumerate(params)
+            if param.kind == inspect.Parameter.VAR_KEYWORD
+        ),
+        len(params),
+    )
+    params.insert(
+        position,
+        inspect.Parameter(
+            "request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        ),
+    )
+    return signature.replace(parameters=params), "request"
+
+
+def cache(expire: int, max_stale: int = CACHE_MAX_STALE):
+    """Cache an endpoint function with stale-while-revalidate
+
+    The endpoint returns the cached JSON body as is, without serializing again,
+    gzipped when the client accepts it, and answers 304 when If-None-Match
+    matches its ETag.
+
+    The wrapped function gets a warm(*args, lead=0, **kwargs) coroutine that
+    refreshes the entry for those arguments ahead of its expiry.
+
+    Args:
+        expire: seconds the result is fresh
+        max_stale: seconds past expire the result is still served while refreshing
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        name = func.__qualname__
+        signature, added_request = _with_request(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = (
+                kwargs.pop(added_request, None)
+                if added_request
+                else next(
+                    (value for value in kwargs.values() if isinstance(value, Request)),
+                    None,
+                )
+            )
+            entry = await endpoint_cache.get(
+                name=name,
+                key=_cache_key(func, args, kwargs),
+                func=lambda: func(*args, **kwargs),
+                expire=expire,
+                max_stale=max_stale,
+            )
+            if isinstance(entry, Response):
+                return entry
+
+            response = _response(entry, request)
+            # keep headers the endpoint set on its injected response (i.e. X-Database)
+            if isinstance(kwargs.get("response"), Response):
+                for header, value in kwargs["response"].headers.items():
+                    if header != "content-length":
+                        response.headers[header] = value
+            return response
+
+        async def warm(*args, lead: int = 0, **kwargs):
+            return await endpoint_cache.warm(
+                name=name,
+                key=_cache_key(func, args, kwargs),
+                func=lambda: func(*args, **kwargs),
+                expire=expire,
+                max_stale=max_stale,
+                lead=lead,
+            )
+
+        wrapper.__signature__ = signature
+        wrapper.warm = warm
+        return wrapper
+
+    return decorator
@@ -11,3 +11,25 @@ ALLDATA_CACHE_TIMEOUT = int(get_config("ALLDATA_CACHE_TIMEOUT"))
 
 DB_CACHE_TIMEOUT = int(get_config("DB_CACHE_TIMEOUT"))  # database calls cache
 
+# served stale while refreshing in background, up to this many seconds past expiry
+CACHE_MAX_STALE = int(get_config("CACHE_MAX_STALE"))
+
+CACHE_MAX_ENTRIES = int(get_config("CACHE_MAX_ENTRIES"))
+
+# memory or sqlite (shared across workers)
+CACHE_BACKEND = get_config("CACHE_BACKEND")
+
+CACHE_SQLITE_PATH = get_config("CACHE_SQLITE_PATH")
+
+CACHE_REFRESH_LEASE = int(get_config("CACHE_REFRESH_LEASE"))
+
+CACHE_GZIP_MIN_SIZE = int(get_config("CACHE_GZIP_MIN_SIZE"))
+
+# cache warmer
+WARMER_ENABLED = str(get_config("WARMER_ENABLED")).lower() == "true"
+
+WARMER_CONCURRENCY = int(get_config("WARMER_CONCURRENCY"))
+
+WARMER_LEAD = int(get_config("WARMER_LEAD"))
+
+WARMER_JITTER = int(get_config("WARMER_JITTER"))
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from endpoint.cache import CacheEntry
+from endpoint.config.cache import (
+    WARMER_CONCURRENCY,
+    WARMER_ENABLED,
+    WARMER_JITTER,
+    WARMER_LEAD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmTarget:
+    """A cached endpoint call to keep warm
+
+    Args:
+        name: shown in the warmer status
+        warm: the warm coroutine function of a cached endpoint (see endpoint.cache.cache)
+        args: positional arguments of the endpoint call, i.e. the router builder
+        kwargs: keyword arguments of the endpoint call, as FastAPI would pass them
+    """
+
+    name: str
+    warm: Callable[..., Awaitable[Any]]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass
+class WarmStatus:
+    last_check: float | None = None
+    last_warm: float | None = None
+    elapsed: float | None = None
+    fresh_until: float | None = None
+    next_warm: float | None = None
+    error: str | None = None
+
+
+class CacheWarmer:
+    """Refresh cached endpoints shortly before they expire
+
+    Every target runs in its own loop, waking up WARMER_LEAD seconds (give or
+    take WARMER_JITTER) before its cache entry expires. At most
+    WARMER_CONCURRENCY targets are computed at the same time.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = WARMER_CONCURRENCY,
+        lead: int = WARMER_LEAD,
+        jitter: int = WARMER_JITTER,
+    ) -> None:
+        self.concurrency = concurrency
+        self.lead = lead
+        self.jitter = jitter
+        self._status: dict[str, WarmStatus] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self, targets: list[WarmTarget]) -> None:
+        if not WARMER_ENABLED or self.running:
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._status = {target.name: WarmStatus() for target in targets}
+        self._tasks = [
+            asyncio.create_task(self._run(target, semaphore)) for target in targets
+        ]
+        logger.info(f" Cache warmer started for {len(targets)} targets")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> dict[str, dict]:
+        return {
+            name: {
+                "lastCheck": status.last_check,
+                "lastWarm": status.last_warm,
+                "elapsed": status.elapsed,
+                "freshUntil": status.fresh_until,
+                "nextWarm": status.next_warm,
+                "error": status.error,
+            }
+            for name, status in self._status.items()
+        }
+
+    async def _run(self, target: WarmTarget, semaphore: asyncio.Semaphore) -> None:
+        # spread the first round so workers and targets do not start together
+        await asyncio.sleep(random.uniform(0, self.jitter))
+
+        while True:
+            async with semaphore:
+                delay = await self._warm(target)
+
+            delay = max(delay + random.uniform(-self.jitter, self.jitter), 1)
+            self._status[target.name].next_warm = time.time() + delay
+            await asyncio.sleep(delay)
+
+    async def _warm(self, target: WarmTarget) -> float:
+        """Warm target and return the seconds to wait for the next round"""
+        status = self._status[target.name]
+        _startime = time.perf_counter()
+        try:
+            entry = await target.warm(*target.args, lead=self.lead, **target.kwargs)
+        except Exception as err:
+            logger.warning(f" Cache warmer failed for {target.name}: {err}")
+            status.error = f"{type(err).__name__}: {err}"
+            return self.lead
+
+        status.error = None
+        status.elapsed = time.perf_counter() - _startime
+        status.last_check = time.time()
+        if not isinstance(entry, CacheEntry):
+            # endpoint answered with a response of its own, which is not cached
+            return self.lead
+
+        # entries may have been computed by another worker sharing the cache
+        status.last_warm = entry.created
+        status.fresh_until = entry.created + entry.expire
+        return entry.expire - entry.age - self.lead
+
+
+cache_warmer = CacheWarmer()
@@ -30,11 +30,22 @@ class database_global(db_collections_common):
                 }
     """
 
+    # fields consumed by the queries, pushed down to the database as projections
+    PRICES_ADDRESSBLOCK_FIELDS = ("address", "block")
+    BLOCKS_TIMESTAMP_FIELDS = ("block", "timestamp")
+
     def __init__(
         self, mongo_url: str, db_name: str = "global", db_collections: dict = None
     ):
         if db_collections is None:
-            db_collections = {"blocks": {"id": True}, "usd_prices": {"id": True}}
+            db_collections = {
+                "blocks": {
+                    "id": True,
+                    ("network", "block"): False,
+                    ("network", "timestamp"): False,
+                },
+                "usd_prices": {"id": True, ("network", "address", "block"): False},
+            }
         super().__init__(
             mongo_url=mongo_url, db_name=db_name, db_collections=db_collections
         )
@@ -72,7 +83,9 @@ class database_global(db_collections_common):
             list:
         """
         return await self.get_items_from_database(
-            collection_name="usd_prices", find={"network": network, "price": {"$gt": 0}}
+            collection_name="usd_prices",
+            find={"network": network, "price": {"$gt": 0}},
+            projection=self.fields_projection(self.PRICES_ADDRESSBLOCK_FIELDS),
         )
 
     async def get_price_usd(
@@ -158,7 +171,10 @@ class database_global(db_collections_common):
             list: of sorted blocks timestamps
         """
         return await self.get_items_from_database(
-            collection_name="blocks", find={"network": network}, sort=[("block", 1)]
+            collection_name="blocks",
+            find={"network": network},
+            projection=self.fields_projection(self.BLOCKS_TIMESTAMP_FIELDS),
+            sort=[("block", 1)],
         )
 
     @staticmethod
@@ -173,6 +189,11 @@ class database_global(db_collections_common):
         """
         return [
             {"$match": {"network": network, "price": {"$gt": 0}}},
+            {
+                "$project": database_global.fields_projection(
+                    database_global.PRICES_ADDRESSBLOCK_FIELDS
+                )
+            },
         ]
 
     @staticmethod
@@ -277,6 +298,40 @@ class database_local(db_collections_common):
                 }
     """
 
+    # fields consumed by the queries, pushed down to the database as projections
+    #   ( $project stages placed before documents are grouped as $$ROOT )
+    STATIC_TOKENS_FIELDS = (
+        "pool.address",
+        "pool.token0.address",
+        "pool.token1.address",
+    )
+    STATUS_FEERETURN_FIELDS = (
+        "block",
+        "timestamp",
+        "totalSupply",
+        "decimals",
+        "totalAmounts.total0",
+        "totalAmounts.total1",
+        "fees_uncollected.qtty_token0",
+        "fees_uncollected.qtty_token1",
+        "tvl.fees_owed_token0",
+        "tvl.fees_owed_token1",
+        "pool.token0.decimals",
+        "pool.token1.decimals",
+    )
+    STATUS_UNCOLLECTED_FEES_FIELDS = (
+        "address",
+        "symbol",
+        "block",
+        "timestamp",
+        "fees_uncollected.qtty_token0",
+        "fees_uncollected.qtty_token1",
+        "tvl.fees_owed_token0",
+        "tvl.fees_owed_token1",
+        "pool.token0.decimals",
+        "pool.token1.decimals",
+    )
+
     def __init__(self, mongo_url: str, db_name: str, db_collections: dict = None):
         if db_collections is None:
             db_collections = {
@@ -285,12 +340,16 @@ class database_local(db_collections_common):
                     "id": True,
                     "address": False,
                     "blockNumber": False,
+                    ("address", "blockNumber", "logIndex"): False,
+                    ("address", "timestamp"): False,
                 },
                 "status": {
                     "id": True,
                     "address": False,
                     "block": False,
                     "timestamp": False,
+                    ("address", "block"): False,
+                    ("address", "timestamp"): False,
                 },
                 "user_status": {
                     "id": True,
@@ -298,6 +357,9 @@ class database_local(db_collections_common):
                     "hypervisor_address": False,
                     "block": False,
                     "timestamp": False,
+                    ("address", "block"): False,
+                    ("hypervisor_address", "block"): False,
+                    ("hypervisor_address", "address", "block", "logIndex"): False,
                 },
                 "rewards_static": {"id": True, "address": False},
             }
@@ -685,6 +747,11 @@ class database_local(db_collections_common):
             list[dict]:
         """
         return [
+            {
+                "$project": database_local.fields_projection(
+                    database_local.STATIC_TOKENS_FIELDS
+                )
+            },
             {
                 "$group": {
                     "_id": "$pool.address",
@@ -806,6 +873,11 @@ class database_local(db_collections_common):
                     ],
                 }
             },
+            {
+                "$project": database_local.fields_projection(
+                    database_local.STATUS_FEERETURN_FIELDS
+                )
+            },
             {"$sort": {"block": 1}},
             {
                 "$group": {
@@ -1069,6 +1141,11 @@ class database_local(db_collections_common):
         """
         query = [
             {"$sort": {"block": -1}},
+            {
+                "$project": database_local.fields_projection(
+                    database_local.STATUS_UNCOLLECTED_FEES_FIELDS
+                )
+            },
             {
                 "$group": {
                     "_id": "$address",
@@ -1109,8 +1186,8 @@ class database_local(db_collections_common):
             },
             {
                 "$addFields": {
-                    "totalFees0": {"$sum": ["uncollectedFees0", "$owedFees0"]},
-                    "totalFees1": {"$sum": ["uncollectedFees1", "$owedFees1"]},
+                    "totalFees0": {"$sum": ["$uncollectedFees0", "$owedFees0"]},
+                    "totalFees1": {"$sum": ["$uncollectedFees1", "$owedFees1"]},
                 }
             },
             {"$unset": ["_id"]},
@@ -1133,7 +1210,7 @@ class database_local(db_collections_common):
                     {
                         "$match": {
                             "address": hypervisor_address,
-                            "block": {"$lte": block},
+                            "timestamp": {"$lte": timestamp},
                         }
                     },
                 )
@@ -0,0 +1,64 @@
+import struct
+from decimal import Decimal
+
+from bson.codec_options import CodecOptions, TypeCodec, TypeRegistry
+from bson.decimal128 import Decimal128, create_decimal128_context
+
+# rounding context of the Decimal128 type ( 34 digits )
+DECIMAL128_CONTEXT = create_decimal128_context()
+
+# Decimal128 binary integer decimal layout:
+#   high 64 bits: sign (1) | biased exponent (14) | coefficient high bits (49)
+#   low 64 bits: coefficient low bits
+_EXPONENT_BIAS = 6176
+_MAX_COEFFICIENT = 10**34 - 1
+_LOW_MASK = (1 << 64) - 1
+_COEFFICIENT_HIGH_MASK = (1 << 49) - 1
+_unpack_bid = struct.Struct("<QQ").unpack
+
+
+def to_decimal128(value: Decimal) -> Decimal128:
+    """Decimal to Decimal128, rounding it to 34 digits when needed.
+    Same result as Decimal128(value) within the Decimal128 context, built with
+    integer operations instead of bson's digit by digit conversion
+    """
+    value = DECIMAL128_CONTEXT.create_decimal(value)
+    if not value.is_finite():
+        return Decimal128(value)
+    sign, _, exponent = value.as_tuple()
+    coefficient = int(value.copy_abs().scaleb(-exponent, DECIMAL128_CONTEXT))
+    return Decimal128(
+        (
+            (sign << 63) | ((exponent + _EXPONENT_BIAS) << 49) | (coefficient >> 64),
+            coefficient & _LOW_MASK,
+        )
+    )
+
+
+def from_decimal128(value: Decimal128) -> Decimal:
+    """Decimal128 to Decimal, same result as value.to_decimal()"""
+    low, high = _unpack_bid(value.bid)
+    coefficient = ((high & _COEFFICIENT_HIGH_MASK) << 64) | low
+    if (high >> 61) & 3 == 3 or coefficient > _MAX_COEFFICIENT:
+        # infinity, NaN or non canonical encodings
+        return value.to_decimal()
+    exponent = ((high >> 49) & 0x3FFF) - _EXPONENT_BIAS
+    return Decimal(f"{'-' if high >> 63 else ''}{coefficient}E{exponent}")
+
+
+class DecimalCodec(TypeCodec):
+    """Let pymongo save Decimal values as Decimal128 and read them back as Decimal"""
+
+    python_type = Decimal
+    bson_type = Decimal128
+
+    def transform_python(self, value: Decimal) -> Decimal128:
+        return to_decimal128(value)
+
+    def transform_bson(self, value: Decimal128) -> Decimal:
+        return from_decimal128(value)
+
+
+# databases opened with these options encode and decode Decimals natively,
+# with no need to walk documents with convert_decimal_to_d128 / convert_d128_to_decimal
+DECIMAL_CODEC_OPTIONS = CodecOptions(type_registry=TypeRegistry([DecimalCodec()]))
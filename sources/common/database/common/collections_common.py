@@ -1,16 +1,23 @@
-from decimal import Decimal, localcontext
+from decimal import Decimal
+from itertools import islice
 import logging
-import asyncio
 from math import log
+from typing import AsyncIterator, Iterable
 
-from bson.decimal128 import Decimal128, create_decimal128_context
+from bson.codec_options import CodecOptions
+from bson.decimal128 import Decimal128
 
-from sources.common.database.common.db_managers import MongoDbManager
+from sources.common.database.common.codecs import from_decimal128, to_decimal128
+from sources.common.database.common.db_managers import MongoDbManager, mongo_pool
+from sources.subgraph.bins.config import MONGO_DB_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
 
 class db_collections_common:
+    # database codec options ( None for pymongo defaults )
+    codec_options: CodecOptions | None = None
+
     def __init__(
         self,
         mongo_url: str,
@@ -26,20 +33,31 @@ class db_collections_common:
         self,
         data: dict,
         collection_name: str,
-    ):
+    ) -> int:
         """Save dictionary values to the database collection replacing any equal id defined
 
+        Items are upserted with unordered bulk writes of MONGO_DB_BULK_BATCH_SIZE items.
+
         Args:
             data (list): data list following tool_mongodb_general class to be saved to database in a dict format
             collection_name (str): collection name to save data to
-        """
-        # add item by item to database
-        requests = [
-            self.save_item_to_database(data=item, collection_name=collection_name)
-            for key, item in data.items()
-        ]
 
-        await asyncio.gather(*requests)
+        Returns:
+            int: number of items that could not be saved
+        """
+        if not data:
+            return 0
+        try:
+            return await mongo_pool.run(
+                self._save_items,
+                items=list(data.values()),
+                collection_name=collection_name,
+            )
+        except Exception as e:
+            logging.getLogger(__name__).exception(
+                f" Unable to save data to mongo's {collection_name} collection.  error-> {e}"
+            )
+            return len(data)
 
     async def save_item_to_database(
         self,
@@ -53,35 +71,46 @@ class db_collections_common:
             collection_name (str): collection name to save data to
         """
         try:
-            with MongoDbManager(
-                url=self._db_mongo_url,
-                db_name=self._db_name,
-                collections=self._db_collections,
-            ) as _db_manager:
-                # add to mongodb
-                _db_manager.add_item(
-                    coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
-                )
+            await mongo_pool.run(
+                self._save_item, data=data, collection_name=collection_name
+            )
         except Exception as e:
             logging.getLogger(__name__).exception(
                 f" Unable to save data to mongo's {collection_name} collection.  error-> {e}"
             )
 
+    async def write_operations_to_database(
+        self, operations: list, collection_name: str, ordered: bool = False
+    ) -> int:
+        """Execute pymongo write operations in bulk
+
+        Returns:
+            int: number of operations not executed
+        """
+        if not operations:
+            return 0
+        try:
+            return await mongo_pool.run(
+                self._write_operations,
+                operations=operations,
+                collection_name=collection_name,
+                ordered=ordered,
+            )
+        except Exception as e:
+            logging.getLogger(__name__).exception(
+                f" Unable to write to mongo's {collection_name} collection.  error-> {e}"
+            )
+            return len(operations)
+
     async def replace_item_to_database(
         self,
         data: dict,
         collection_name: str,
     ):
         try:
-            with MongoDbManager(
-                url=self._db_mongo_url,
-                db_name=self._db_name,
-                collections=self._db_collections,
-            ) as _db_manager:
-                # add to mongodb
-                _db_manager.replace_item(
-                    coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
-                )
+            await mongo_pool.run(
+                self._replace_item, data=data, collection_name=collection_name
+            )
         except Exception as e:
             logging.getLogger(__name__).exception(
                 f" Unable to replace data in mongo's {collection_name} collection.  error-> {e}"
@@ -92,44 +121,148 @@ class db_collections_common:
         query: list[dict],
         collection_name: str,
     ) -> list:
-        # db_manager = self.create_db_manager()
-        with MongoDbManager(
-            url=self._db_mongo_url,
-            db_name=self._db_name,
-            collections=self._db_collections,
-        ) as _db_manager:
-            result = list(
-                _db_manager.get_items(coll_name=collection_name, aggregate=query)
-            )
-        return result
+        return await mongo_pool.run(
+            self._query_items, query=query, collection_name=collection_name
+        )
 
     async def get_items_from_database(self, collection_name: str, **kwargs) -> list:
-        with MongoDbManager(
-            url=self._db_mongo_url,
-            db_name=self._db_name,
-            collections=self._db_collections,
-        ) as _db_manager:
-            result = _db_manager.get_items(coll_name=collection_name, **kwargs)
-            result = list(result)
-        return result
+        return await mongo_pool.run(
+            self._get_items, collection_name=collection_name, **kwargs
+        )
 
     async def get_distinct_items_from_database(
         self, field: str, collection_name: str, condition: dict = None
     ) -> list:
-        with MongoDbManager(
+        return await mongo_pool.run(
+            self._get_distinct_items,
+            field=field,
+            collection_name=collection_name,
+            condition=condition,
+        )
+
+    async def iterate_items_from_database(
+        self, collection_name: str, batch_size: int = MONGO_DB_BATCH_SIZE, **kwargs
+    ) -> AsyncIterator[dict]:
+        """Stream the items of get_items_from_database instead of loading them all
+
+        Args:
+            collection_name (str):
+            batch_size (int): items fetched from the database at a time
+            **kwargs: find, aggregate, projection, sort, limit ... as in get_items_from_database
+
+        Yields:
+            dict: item
+        """
+        cursor = await mongo_pool.run(
+            self._get_cursor,
+            collection_name=collection_name,
+            batch_size=batch_size,
+            **kwargs,
+        )
+        try:
+            while batch := await mongo_pool.run(self._next_batch, cursor, batch_size):
+                for item in batch:
+                    yield item
+        finally:
+            await mongo_pool.run(cursor.close)
+
+    def iterate_query_items_from_database(
+        self,
+        query: list[dict],
+        collection_name: str,
+        batch_size: int = MONGO_DB_BATCH_SIZE,
+        projection: dict | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream the items of query_items_from_database instead of loading them all"""
+        kwargs = {"projection": projection} if projection else {}
+        return self.iterate_items_from_database(
+            collection_name=collection_name,
+            batch_size=batch_size,
+            aggregate=query,
+            **kwargs,
+        )
+
+    async def setup_collections(self):
+        """Create the collections and indexes defined for this database"""
+        await mongo_pool.run(self._db_manager)
+
+    # blocking database calls, run in the mongo thread pool
+    def _db_manager(self) -> MongoDbManager:
+        return MongoDbManager(
             url=self._db_mongo_url,
             db_name=self._db_name,
             collections=self._db_collections,
-        ) as _db_manager:
-            result = list(
+            codec_options=self.codec_options,
+        )
+
+    def _save_item(self, data: dict, collection_name: str):
+        with self._db_manager() as _db_manager:
+            # add to mongodb
+            _db_manager.add_item(
+                coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
+            )
+
+    def _save_items(self, items: list[dict], collection_name: str) -> int:
+        with self._db_manager() as _db_manager:
+            return _db_manager.add_items(coll_name=collection_name, items=items)
+
+    def _write_operations(
+        self, operations: list, collection_name: str, ordered: bool
+    ) -> int:
+        with self._db_manager() as _db_manager:
+            return _db_manager.write_operations(
+                coll_name=collection_name, operations=operations, ordered=ordered
+            )
+
+    def _replace_item(self, data: dict, collection_name: str):
+        with self._db_manager() as _db_manager:
+            # add to mongodb
+            _db_manager.replace_item(
+                coll_name=collection_name, dbFilter={"id": data["id"]}, data=data
+            )
+
+    def _query_items(self, query: list[dict], collection_name: str) -> list:
+        with self._db_manager() as _db_manager:
+            return list(
+                _db_manager.get_items(coll_name=collection_name, aggregate=query)
+            )
+
+    def _get_items(self, collection_name: str, **kwargs) -> list:
+        with self._db_manager() as _db_manager:
+            return list(_db_manager.get_items(coll_name=collection_name, **kwargs))
+
+    def _get_cursor(self, collection_name: str, **kwargs):
+        with self._db_manager() as _db_manager:
+            return _db_manager.get_items(coll_name=collection_name, **kwargs)
+
+    @staticmethod
+    def _next_batch(cursor, batch_size: int) -> list:
+        return list(islice(cursor, batch_size))
+
+    def _get_distinct_items(
+        self, field: str, collection_name: str, condition: dict | None
+    ) -> list:
+        with self._db_manager() as _db_manager:
+            return list(
                 _db_manager.get_distinct(
                     coll_name=collection_name, field=field, condition=condition or {}
                 )
             )
 
-        return result
-
     # TOOLING
+    @staticmethod
+    def fields_projection(fields: Iterable[str]) -> dict:
+        """Projection keeping only the fields a query consumes ( no _id ).
+            Usable as find projection or as the content of a $project stage.
+
+        Args:
+            fields (Iterable[str]): field names, dot notation for embedded ones
+
+        Returns:
+            dict: {"_id": 0, <field>: 1, ...}
+        """
+        return {"_id": 0} | dict.fromkeys(fields, 1)
+
     @staticmethod
     def bytes_needed(n):
         if n == 0:
@@ -162,9 +295,7 @@ class db_collections_common:
                 for l in v:
                     db_collections_common.convert_decimal_to_d128(l)
             elif isinstance(v, Decimal):
-                decimal128_ctx = create_decimal128_context()
-                with localcontext(decimal128_ctx) as ctx:
-                    item[k] = Decimal128(ctx.create_decimal(str(v)))
+                item[k] = to_decimal128(v)
             else:
                 raise TypeError(f"item is not a dict, list or Decimal: {item}")
 
@@ -196,7 +327,7 @@ class db_collections_common:
                 for l in v:
                     db_collections_common.convert_d128_to_decimal(l)
             elif isinstance(v, Decimal128):
-                item[k] = v.to_decimal()
+                item[k] = from_decimal128(v)
             else:
                 item[k] = v
 
@@ -1,12 +1,106 @@
+import asyncio
 import logging
-from pymongo import MongoClient
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from bson.codec_options import CodecOptions
+from pymongo import ASCENDING, MongoClient, UpdateOne
 from pymongo import errors as MongoErrors
 
-from sources.subgraph.bins.config import MONGO_DB_TIMEOUTMS
+from sources.subgraph.bins.config import (
+    MONGO_DB_BULK_BATCH_SIZE,
+    MONGO_DB_THREADS,
+    MONGO_DB_TIMEOUTMS,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class MongoClientPool:
+    """
+    One MongoClient, and so one connection pool, per mongo url and process.
+    Collections and their indexes are set up the first time a database is
+    used by the process instead of on every operation.
+    pymongo calls block, so async code runs them with run(), in a bounded
+    thread pool, to keep the event loop serving other requests meanwhile.
+    """
+
+    def __init__(self, threads: int = MONGO_DB_THREADS) -> None:
+        self.threads = threads
+        self._clients: dict[str, MongoClient] = {}
+        self._configured: set[tuple] = set()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _check_fork(self) -> None:
+        # MongoClient and threads do not survive a fork: forked workers open their own
+        if self._pid != os.getpid():
+            self._clients.clear()
+            self._configured.clear()
+            self._executor = None
+            self._pid = os.getpid()
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking database call in the mongo thread pool"""
+        self._check_fork()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="mongo"
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    def client(self, url: str, serverSelectionTimeoutMS: int) -> MongoClient:
+        self._check_fork()
+
+        if url not in self._clients:
+            with self._lock:
+                if url not in self._clients:
+                    self._clients[url] = MongoClient(
+                        url, serverSelectionTimeoutMS=serverSelectionTimeoutMS
+                    )
+        return self._clients[url]
+
+    def configure(self, url: str, database, collections: dict) -> None:
+        """Create the indexes of collections not set up yet by this process
+
+        Args:
+            collections (dict): { <collection name>: { <field>: <unique>, ...} ...}
+                                where <field> is a field name or a tuple of field
+                                names for an ascending compound index
+        """
+        for coll_name, fields in collections.items():
+            for field, unique in fields.items():
+                key = (url, database.name, coll_name, field)
+                if key in self._configured:
+                    continue
+                database[coll_name].create_index(
+                    [(name, ASCENDING) for name in field]
+                    if isinstance(field, tuple)
+                    else field,
+                    unique=unique,
+                )
+                self._configured.add(key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._configured.clear()
+
+
+mongo_pool = MongoClientPool()
+
+
 class MongoDbManager:
     def __init__(
         self,
@@ -14,6 +108,7 @@ class MongoDbManager:
         db_name: str,
         collections: dict,
         serverSelectionTimeoutMS: int = MONGO_DB_TIMEOUTMS,
+        codec_options: CodecOptions | None = None,
     ):
         """Mongo database helper
 
@@ -30,23 +125,22 @@ class MongoDbManager:
                                        },
                                }
             serverSelectionTimeoutMS (int): maximum number of milliseconds to timeout connection
+            codec_options (CodecOptions, optional): database codec options, like DECIMAL_CODEC_OPTIONS
         """
 
-        # connect to mongo database
+        self.url = url
+        # connect to mongo database, sharing the process wide client
         try:
-            self.mongo_client = MongoClient(
-                url, serverSelectionTimeoutMS=serverSelectionTimeoutMS
-            )
+            self.mongo_client = mongo_pool.client(url, serverSelectionTimeoutMS)
         except MongoErrors.ServerSelectionTimeoutError:
             raise Exception(
                 f" Connection timed out using {serverSelectionTimeoutMS} ms. Try increasing this value if u know server is responding"
             )
         except MongoErrors.ConnectionFailure:
             raise Exception("Failed to connect to {}".format(url))
-        self.database = self.mongo_client[db_name]
-
-        # Retrieve database collection names
-        self.database_collections = self.database.list_collection_names()
+        self.database = self.mongo_client.get_database(
+            db_name, codec_options=codec_options
+        )
 
         # define collection configurations
         self.collections_config = collections
@@ -58,27 +152,19 @@ class MongoDbManager:
         return self
 
     def __exit__(self, type, value, traceback):
-        # xception handling here
-        self.mongo_client.close()
+        # the client is shared, its connections go back to the pool
+        pass
 
     def configure_collections(self):
-        """define collection names and create indexes"""
-        for coll_name, fields in self.collections_config.items():
-            for field, unique in fields.items():
-                self.database[coll_name].create_index(field, unique=unique)
+        """define collection names and create indexes, once per process"""
+        mongo_pool.configure(self.url, self.database, self.collections_config)
 
-    def create_collection(self, coll_name: str, **indexes):
+    def create_collection(self, coll_name: str, indexes: dict):
         """Creates a collection if it does not exist.
         Arguments:
-           indexes = [ <collection field name>:str = <unique>:bool  ]
+           indexes = { <collection field name or tuple of field names>:str|tuple : <unique>:bool }
         """
-
-        if not coll_name in self.database_collections:
-            for field, unique in indexes.items():
-                self.database[coll_name].create_index(field, unique=unique)
-
-            # refresh database collection names
-            self.database_collections = self.database.list_collection_names()
+        mongo_pool.configure(self.url, self.database, {coll_name: indexes})
 
     def add_item(self, coll_name: str, dbFilter: dict, data: dict, upsert=True):
         """Add or Update item
@@ -100,7 +186,7 @@ class MongoDbManager:
             )
         # create collection if it does not exist yet
         self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
+            coll_name=coll_name, indexes=self.collections_config[coll_name]
         )
 
         # add/ update to database (add or replace)
@@ -108,6 +194,94 @@ class MongoDbManager:
             filter=dbFilter, update={"$set": data}, upsert=True
         )
 
+    def add_items(
+        self,
+        coll_name: str,
+        items: list[dict],
+        batch_size: int = MONGO_DB_BULK_BATCH_SIZE,
+    ) -> int:
+        """Add or Update items by id with unordered bulk writes
+
+        A failed batch or item is logged and does not stop the others.
+
+        Args:
+           coll_name (str): collection name
+           items (list[dict]): data to save, each with an "id" field
+           batch_size (int, optional): items per bulk write.
+
+        Raises:
+           ValueError: if coll_name is not defined at the class init <collections> field
+
+        Returns:
+           int: number of items that could not be saved
+        """
+        return self.write_operations(
+            coll_name=coll_name,
+            operations=[
+                UpdateOne({"id": item["id"]}, {"$set": item}, upsert=True)
+                for item in items
+            ],
+            ordered=False,
+            batch_size=batch_size,
+        )
+
+    def write_operations(
+        self,
+        coll_name: str,
+        operations: list,
+        ordered: bool = False,
+        batch_size: int = MONGO_DB_BULK_BATCH_SIZE,
+    ) -> int:
+        """Execute write operations (UpdateOne, DeleteMany...) with bulk writes
+
+        A failed batch or operation is logged and does not stop the next batches.
+
+        Args:
+           coll_name (str): collection name
+           operations (list): pymongo write operations
+           ordered (bool, optional): stop a batch at its first failed operation,
+                                     so operations may depend on the previous ones
+           batch_size (int, optional): operations per bulk write.
+
+        Raises:
+           ValueError: if coll_name is not defined at the class init <collections> field
+
+        Returns:
+           int: number of operations not executed
+        """
+        if not coll_name in self.collections_config.keys():
+            raise ValueError(
+                f" No configuration found for {coll_name} database collection."
+            )
+        self.create_collection(
+            coll_name=coll_name, indexes=self.collections_config[coll_name]
+        )
+
+        failed = 0
+        batches = range(0, len(operations), batch_size)
+        for batch_number, start in enumerate(batches, start=1):
+            batch = operations[start : start + batch_size]
+            try:
+                self.database[coll_name].bulk_write(batch, ordered=ordered)
+            except MongoErrors.BulkWriteError as err:
+                write_errors = err.details.get("writeErrors", [])
+                # ordered batches stop at their first error
+                failed += (
+                    len(batch) - write_errors[0]["index"]
+                    if ordered and write_errors
+                    else len(write_errors)
+                )
+                logger.error(
+                    f" {len(write_errors)} of {len(batch)} operations of batch {batch_number}/{len(batches)} failed in {coll_name}. first error-> {write_errors[0]['errmsg'] if write_errors else err}"
+                )
+            except Exception as err:
+                failed += len(batch)
+                logger.error(
+                    f" Batch {batch_number}/{len(batches)} of {len(batch)} operations failed in {coll_name}. error-> {err}"
+                )
+
+        return failed
+
     def replace_item(self, coll_name: str, dbFilter: dict, data: dict, upsert=True):
         """Add or Update item
 
@@ -128,7 +302,7 @@ class MongoDbManager:
             )
         # create collection if it does not exist yet
         self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
+            coll_name=coll_name, indexes=self.collections_config[coll_name]
         )
 
         # add/ update to database (add or replace)
@@ -148,6 +322,7 @@ class MongoDbManager:
                                                    "$gte": <date>
                                                      }
                                        }
+                                   projection={"_id": 0, "block": 1}
                                    batch_size=100
                                    sort=[(<field_01>,1), (<field_02>,-1) ]
                                    limit=10
@@ -164,70 +339,35 @@ class MongoDbManager:
                                                        }
                                                }]
                                    allowDiskUse=<bool>
+                                   projection=  ( added as a final $project stage )
+                                   batch_size=100
         """
 
         # build FIND result
         if "find" in kwargs:
-            if "batch_size" in kwargs:
-                if "sort" in kwargs:
-                    if "limit" in kwargs:
-                        return (
-                            self.database[coll_name]
-                            .find(kwargs["find"], batch_size=kwargs["batch_size"])
-                            .sort(kwargs["sort"])
-                            .limit(kwargs["limit"])
-                        )
-                    else:
-                        if "limit" in kwargs:
-                            return (
-                                self.database[coll_name]
-                                .find(kwargs["find"], batch_size=kwargs["batch_size"])
-                                .sort(kwargs["sort"])
-                                .limit(kwargs["limit"])
-                            )
-                        else:
-                            return (
-                                self.database[coll_name]
-                                .find(kwargs["find"], batch_size=kwargs["batch_size"])
-                                .sort(kwargs["sort"])
-                            )
-                else:
-                    return self.database[coll_name].find(
-                        kwargs["find"], batch_size=kwargs["batch_size"]
-                    )
-            else:
-                if "sort" in kwargs:
-                    if "limit" in kwargs:
-                        return (
-                            self.database[coll_name]
-                            .find(kwargs["find"])
-                            .sort(kwargs["sort"])
-                            .limit(kwargs["limit"])
-                        )
-                    else:
-                        return (
-                            self.database[coll_name]
-                            .find(kwargs["find"])
-                            .sort(kwargs["sort"])
-                        )
-                else:
-                    if "limit" in kwargs:
-                        return (
-                            self.database[coll_name]
-                            .find(kwargs["find"])
-                            .limit(kwargs["limit"])
-                        )
-                    else:
-                        return self.database[coll_name].find(kwargs["find"])
+            cursor = self.database[coll_name].find(
+                kwargs["find"],
+                projection=kwargs.get("projection"),
+                batch_size=kwargs.get("batch_size", 0),
+            )
+            if "sort" in kwargs:
+                cursor = cursor.sort(kwargs["sort"])
+            if "limit" in kwargs:
+                cursor = cursor.limit(kwargs["limit"])
+            return cursor
 
         # build AGGREGATE result
         elif "aggregate" in kwargs:
+            pipeline = kwargs["aggregate"]
+            if "projection" in kwargs:
+                # only return the projected fields
+                pipeline = [*pipeline, {"$project": kwargs["projection"]}]
+            options = {}
             if "allowDiskUse" in kwargs:
-                return self.database[coll_name].aggregate(
-                    kwargs["aggregate"], allowDiskUse=kwargs["allowDiskUse"]
-                )
-            else:
-                return self.database[coll_name].aggregate(kwargs["aggregate"])
+                options["allowDiskUse"] = kwargs["allowDiskUse"]
+            if "batch_size" in kwargs:
+                options["batchSize"] = kwargs["batch_size"]
+            return self.database[coll_name].aggregate(pipeline, **options)
 
     def get_distinct(self, coll_name: str, field: str, condition: dict = {}):
         """get distinct items of a database field
@@ -244,4 +384,3 @@ class MongoDbManager:
 
     # TODO: push_item ( add_item without id involved )
     # TODO: push_items ( add/update multiple items )
-    # TODO: add_items ( add/update multiple items )
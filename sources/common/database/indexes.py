@@ -0,0 +1,218 @@
+import asyncio
+import inspect
+import logging
+import sys
+from typing import Callable
+
+from sources.common.database.collection_endpoint import (
+    database_global,
+    database_local,
+)
+from sources.common.database.common.collections_common import db_collections_common
+from sources.common.database.common.db_managers import mongo_pool
+from sources.common.general.enums import Chain
+from sources.subgraph.bins.config import MONGO_DB_TIMEOUTMS, MONGO_DB_URL
+from sources.subgraph.bins.database.managers import (
+    db_aggregateStats_manager,
+    db_allData_manager,
+    db_allRewards2_manager,
+    db_returns_manager,
+    db_static_manager,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def database_helpers(mongo_url: str = MONGO_DB_URL) -> list[db_collections_common]:
+    """All databases used by the endpoint: gamma_db_v1, global and {network}_gamma"""
+    return [
+        db_static_manager(mongo_url=mongo_url),
+        db_returns_manager(mongo_url=mongo_url),
+        db_allData_manager(mongo_url=mongo_url),
+        db_allRewards2_manager(mongo_url=mongo_url),
+        db_aggregateStats_manager(mongo_url=mongo_url),
+        database_global(mongo_url=mongo_url),
+    ] + [
+        database_local(mongo_url=mongo_url, db_name=f"{chain.value}_gamma")
+        for chain in Chain
+    ]
+
+
+async def create_indexes(mongo_url: str = MONGO_DB_URL):
+    """Create the collections and indexes declared by every database helper"""
+    for helper in database_helpers(mongo_url=mongo_url):
+        try:
+            await helper.setup_collections()
+        except Exception as e:
+            logger.error(
+                f" Unable to create the indexes of {helper._db_name} database. error-> {e}"
+            )
+
+
+# explain plan tool
+# query builders to check:  (database, collection, query builder)
+#   database: "gamma_db_v1", "global" or "local" ( every {network}_gamma )
+QUERY_BUILDERS: list[tuple[str, str, Callable]] = [
+    ("gamma_db_v1", "returns", db_returns_manager.query_hypervisors_average),
+    ("gamma_db_v1", "returns", db_returns_manager.query_hypervisors_returns_average),
+    ("gamma_db_v1", "returns", db_returns_manager.query_last_returns),
+    ("gamma_db_v1", "returns", db_returns_manager.query_return_impermanent),
+    ("gamma_db_v1", "returns", db_returns_manager.query_return_imperm_rewards2_flat),
+    ("gamma_db_v1", "returns", db_returns_manager.query_impermanentDivergence),
+    ("gamma_db_v1", "allData", db_allData_manager.query_all),
+    ("gamma_db_v1", "allRewards2", db_allRewards2_manager.query_all),
+    ("gamma_db_v1", "allRewards2", db_allRewards2_manager.query_last),
+    ("gamma_db_v1", "allRewards2", db_allRewards2_manager.query_hype_rewards),
+    ("gamma_db_v1", "agregateStats", db_aggregateStats_manager.query_last),
+    ("global", "usd_prices", database_global.query_prices_addressBlocks),
+    ("global", "blocks", database_global.query_blocks_closest),
+    ("local", "operations", database_local.query_unique_addressBlocks),
+    ("local", "static", database_local.query_unique_token_addresses),
+    ("local", "static", database_local.query_status_mostUsed_token1),
+    ("local", "status", database_local.query_max),
+    ("local", "status", database_local.query_status_btwn_blocks),
+    ("local", "status", database_local.query_status_feeReturn_data),
+    ("local", "status", database_local.query_status_feeReturn_data_alternative),
+    ("local", "status", database_local.query_uncollected_fees),
+    ("local", "operations", database_local.query_operations),
+    ("local", "operations", database_local.query_operations_summary),
+    ("local", "operations", database_local.query_all_users),
+]
+
+
+def _sample_arguments(database) -> dict:
+    """Query builder arguments taken from existing documents, by argument name"""
+    if database.name == "gamma_db_v1":
+        if not (item := database["returns"].find_one(sort=[("_id", -1)])):
+            return {}
+        static = database["static"].find_one(
+            {"chain": item["chain"], "address": item["address"]}
+        )
+        return {
+            "chain": item["chain"],
+            "period": item["period"],
+            "hypervisor_address": item["address"],
+            "protocol": static["protocol"] if static else None,
+        }
+
+    if database.name == "global":
+        if not (item := database["blocks"].find_one(sort=[("_id", -1)])):
+            return {}
+        return {
+            "network": item["network"],
+            "block": item["block"],
+            "timestamp": item["timestamp"],
+        }
+
+    # {network}_gamma
+    arguments = {"field": "block"}
+    if item := database["status"].find_one(sort=[("_id", -1)]):
+        arguments |= {
+            "hypervisor_address": item["address"],
+            "block": item["block"],
+            "block_ini": item["block"],
+            "block_end": item["block"],
+            "timestamp": item["timestamp"],
+            "timestamp_ini": item["timestamp"] - 60 * 60 * 24 * 7,
+            "timestamp_end": item["timestamp"],
+        }
+    if item := database["user_status"].find_one(sort=[("_id", -1)]):
+        arguments["user_address"] = item["address"]
+    return arguments
+
+
+def _collection_scans(plan) -> bool:
+    """The explain output has a collection scan stage"""
+    if isinstance(plan, dict):
+        return plan.get("stage") == "COLLSCAN" or any(
+            _collection_scans(value)
+            for key, value in plan.items()
+            if key != "rejectedPlans"
+        )
+    if isinstance(plan, list):
+        return any(_collection_scans(value) for value in plan)
+    return False
+
+
+def explain_database(database, kind: str) -> list[dict]:
+    """Explain the aggregations of every query builder of a database kind
+
+    Returns:
+        list[dict]: [{"database", "collection", "query", "result"} ...]
+                    result is "ok", "COLLSCAN" or why it could not be checked
+    """
+    arguments = _sample_arguments(database)
+    results = []
+    for db_kind, collection, builder in QUERY_BUILDERS:
+        if db_kind != kind:
+            continue
+        result = {
+            "database": database.name,
+            "collection": collection,
+            "query": builder.__qualname__,
+        }
+        results.append(result)
+
+        parameters = inspect.signature(builder).parameters.values()
+        if missing := [
+            param.name
+            for param in parameters
+            if param.name not in arguments and param.default is param.empty
+        ]:
+            result["result"] = f"not covered, no sample for {', '.join(missing)}"
+            continue
+
+        pipeline = builder(
+            **{
+                param.name: arguments[param.name]
+                for param in parameters
+                if param.name in arguments
+            }
+        )
+        try:
+            explain = database.command(
+                "aggregate", collection, pipeline=pipeline, explain=True
+            )
+        except Exception as e:
+            result["result"] = f"error: {e}"
+            continue
+
+        if not _collection_scans(explain):
+            result["result"] = "ok"
+        elif "$match" not in pipeline[0]:
+            # aggregations of the whole collection cannot use an index
+            result["result"] = "COLLSCAN (whole collection aggregation)"
+        else:
+            result["result"] = "COLLSCAN"
+    return results
+
+
+def explain_queries(mongo_url: str = MONGO_DB_URL) -> list[dict]:
+    """Explain every query builder against the databases at mongo_url"""
+    client = mongo_pool.client(mongo_url, MONGO_DB_TIMEOUTMS)
+    results = explain_database(client["gamma_db_v1"], "gamma_db_v1")
+    results += explain_database(client["global"], "global")
+    for chain in Chain:
+        results += explain_database(client[f"{chain.value}_gamma"], "local")
+    return results
+
+
+if __name__ == "__main__":
+    # python -m sources.common.database.indexes [--create]
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+
+    if "--create" in sys.argv[1:]:
+        asyncio.run(create_indexes())
+
+    scans = 0
+    for result in explain_queries():
+        logger.info(
+            f" {result['result']:<45} {result['database']}.{result['collection']}  {result['query']}"
+        )
+        scans += result["result"] == "COLLSCAN"
+
+    mongo_pool.close()
+    sys.exit(1 if scans else 0)
@@ -20,14 +20,14 @@ def get_list(
     )
 
 
-def get_uncollected_fees(
+async def get_uncollected_fees(
     network: Chain,
     hypervisor_address: str,
     timestamp: int | None = None,
     block: int | None = None,
-) -> dict:
+) -> list[dict]:
     """Get the uncollected fees for a hypervisor."""
-    return create_local_database(network=network).get_items_from_database(
+    return await create_local_database(network=network).query_items_from_database(
         collection_name="status",
         query=database_local.query_uncollected_fees(
             hypervisor_address=hypervisor_address, timestamp=timestamp, block=block
@@ -35,17 +35,17 @@ def get_uncollected_fees(
     )
 
 
-def get_collected_fees(
+async def get_collected_fees(
     network: Chain,
     hypervisor_address: str,
     start_timestamp: int | None = None,
     end_timestamp: int | None = None,
     start_block: int | None = None,
     end_block: int | None = None,
-) -> dict:
+) -> list[dict]:
     """Get the collected fees for a hypervisor."""
-    return create_local_database(network=network).get_hypervisor_operations(
-        collection_name="status",
+    return await create_local_database(network=network).query_items_from_database(
+        collection_name="operations",
         query=database_local.query_operations_summary(
             hypervisor_address=hypervisor_address,
             timestamp_ini=start_timestamp,
@@ -196,7 +196,7 @@ class mongo_router_builder(router_builder_generalTemplate):
         timestamp: int | None = None,
         block: int | None = None,
     ):
-        return hypervisor.get_uncollected_fees(
+        return await hypervisor.get_uncollected_fees(
             network=self.chain,
             hypervisor_address=hypervisor_address,
             timestamp=timestamp,
@@ -212,7 +212,7 @@ class mongo_router_builder(router_builder_generalTemplate):
         start_block: int | None = None,
         end_block: int | None = None,
     ):
-        return hypervisor.get_collected_fees(
+        return await hypervisor.get_collected_fees(
             network=self.chain,
             hypervisor_address=hypervisor_address,
             start_timestamp=start_timestamp,
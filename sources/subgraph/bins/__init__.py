@@ -1,4 +1,7 @@
+import asyncio
+import json
 import logging
+from typing import AsyncIterator
 
 import httpx
 
@@ -11,7 +14,9 @@ from sources.subgraph.bins.config import (
     UNI_V2_SUBGRAPH_URL,
     XGAMMA_SUBGRAPH_URL,
 )
+from sources.subgraph.bins.circuit_breaker import circuit_breakers
 from sources.subgraph.bins.enums import Chain, Protocol
+from sources.subgraph.bins.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 async_client = httpx.AsyncClient(
@@ -20,6 +25,11 @@ async_client = httpx.AsyncClient(
     ),
     timeout=180,
 )
+# identical in-flight subgraph queries share one request
+query_flights = SingleFlight()
+
+# max entities per subgraph query
+PAGE_SIZE = 1000
 
 
 class SubgraphClient:
@@ -38,7 +48,14 @@ class SubgraphClient:
         # ssl.SSLError:
         # [SSL: SSLV3_ALERT_HANDSHAKE_FAILURE] sslv3 alert handshake failure
         #
-        response = await async_client.post(self._url, json=params)
+        # the response is shared, each caller decodes its own json copy
+        response = await query_flights.run(
+            key=(self._url, query, json.dumps(variables, sort_keys=True, default=str)),
+            func=lambda: circuit_breakers.get(self._url).call(
+                lambda: async_client.post(self._url, json=params),
+                failed=lambda response: response.status_code != 200,
+            ),
+        )
 
         if response.status_code == 200:
             try:
@@ -61,28 +78,68 @@ class SubgraphClient:
         # error return
         return {}
 
-    async def paginate_query(self, query, paginate_variable, variables={}):
-        # if not variables:
-        #     variables = {}
-
+    async def paginate(
+        self,
+        query: str,
+        variables: dict | None = None,
+        paginate_variable: str = "id",
+        cursor: str = "",
+        page_size: int = PAGE_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        """Yield pages of a cursor paginated query as they arrive
+
+        The query must have a single root field ordered ascending by
+        <paginate_variable>, filtered by `<paginate_variable>_gt: $paginate`
+        and limited with `first: $first`.
+        The next page is requested before the current one is yielded,
+        so it downloads while the consumer processes the current page.
+
+        Args:
+            query (str): graphql query
+            variables (dict, optional): query variables other than paginate/first
+            paginate_variable (str, optional): cursor field. Defaults to "id".
+            cursor (str, optional): initial cursor value. Defaults to "".
+            page_size (int, optional): entities per page. Defaults to PAGE_SIZE.
+        """
         if f"{paginate_variable}_gt" not in query:
             raise ValueError("Paginate variable missing in query")
 
-        variables["orderBy"] = paginate_variable
-        variables["orderDirection"] = "asc"
-
-        all_data = []
-        has_data = True
-        params = {"query": query, "variables": variables}
-        while has_data:
-            response = await async_client.post(self._url, json=params)
-            data = next(iter(response.json()["data"].values()))
-            has_data = bool(data)
-            if has_data:
-                all_data += data
-                params["variables"]["paginate"] = data[-1][paginate_variable]
-
-        return all_data
+        variables = (variables or {}) | {"first": page_size}
+
+        next_page = asyncio.ensure_future(
+            self._query_page(query, variables | {"paginate": cursor})
+        )
+        try:
+            while next_page:
+                page = await next_page
+                next_page = None
+                if len(page) == page_size:
+                    next_page = asyncio.ensure_future(
+                        self._query_page(
+                            query,
+                            variables | {"paginate": page[-1][paginate_variable]},
+                        )
+                    )
+                if page:
+                    yield page
+        finally:
+            # consumer stopped early
+            if next_page:
+                next_page.cancel()
+
+    async def paginate_query(
+        self, query: str, paginate_variable: str, variables: dict | None = None
+    ) -> list[dict]:
+        """Query all pages and return them as one list"""
+        return [
+            item
+            async for page in self.paginate(query, variables, paginate_variable)
+            for item in page
+        ]
+
+    async def _query_page(self, query: str, variables: dict) -> list[dict]:
+        response = await self.query(query, variables)
+        return next(iter(response["data"].values()))
 
 
 class GammaClient(SubgraphClient):
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 
 import numpy as np
@@ -75,11 +76,21 @@ class BaseLimit:
 
         return results
 
+    @staticmethod
+    def _sort_rebalances(rebalances: list[dict]) -> list[dict]:
+        """Rebalances without their cursor fields, newest first"""
+        for rebalance in rebalances:
+            rebalance.pop("id", None)
+            rebalance.pop("hypervisor", None)
+        return sorted(
+            rebalances, key=lambda rebalance: int(rebalance["timestamp"]), reverse=True
+        )
+
     async def _get_data(self, hypervisor_address):
         """Get data for one hypervisor"""
         hypervisor_address = hypervisor_address.lower()
         query = """
-        query historicalRanges($id: String!){
+        query historicalRanges($id: String!, $timestampStart: Int!){
             uniswapV3Hypervisor(
                 id: $id
             ){
@@ -96,10 +107,15 @@ class BaseLimit:
                         decimals
                     }
                 }
+                # last rebalance before timestampStart: the ranges in place
+                # when the chart starts
                 rebalances(
-                    first: 1000
+                    first: 1
                     orderBy: timestamp
                     orderDirection: desc
+                    where: {
+                        timestamp_lt: $timestampStart
+                    }
                 ){
                     timestamp
                     tick
@@ -111,18 +127,49 @@ class BaseLimit:
             }
         }
         """
-        variables = {"id": hypervisor_address}
-        response = await self.gamma_client.query(query, variables)
+        query_rebalances = """
+        query rebalances($id: String!, $timestampStart: Int!, $first: Int!, $paginate: String!){
+            uniswapV3Rebalances(
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    hypervisor: $id
+                    timestamp_gte: $timestampStart
+                    id_gt: $paginate
+                }
+            ){
+                id
+                timestamp
+                tick
+                baseLower
+                baseUpper
+                limitLower
+                limitUpper
+            }
+        }
+        """
+        variables = {"id": hypervisor_address, "timestampStart": self.timestamp_start}
+        response, rebalances = await asyncio.gather(
+            self.gamma_client.query(query, variables),
+            self.gamma_client.paginate_query(query_rebalances, "id", variables),
+        )
         data = response["data"]["uniswapV3Hypervisor"]
+        data["rebalances"] = self._sort_rebalances(rebalances + data["rebalances"])
 
         return self._reshape(data)
 
     async def _get_all_data(self):
         """Get data for all hypervisors"""
         query = """
-        query historicalRanges($timestampStart: Int!){
+        query historicalRanges($timestampStart: Int!, $first: Int!, $paginate: String!){
             uniswapV3Hypervisors(
-                first:1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 pool{
@@ -138,10 +185,15 @@ class BaseLimit:
                         decimals
                     }
                 }
+                # last rebalance before timestampStart: the ranges in place
+                # when the chart starts
                 rebalances(
-                    first: 1000
+                    first: 1
                     orderBy: timestamp
                     orderDirection: desc
+                    where: {
+                        timestamp_lt: $timestampStart
+                    }
                 ){
                     timestamp
                     tick
@@ -153,11 +205,51 @@ class BaseLimit:
             }
         }
         """
+        # rebalances of all hypervisors, instead of the latest 1000 of each
+        query_rebalances = """
+        query rebalances($timestampStart: Int!, $first: Int!, $paginate: String!){
+            uniswapV3Rebalances(
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    timestamp_gte: $timestampStart
+                    id_gt: $paginate
+                }
+            ){
+                id
+                hypervisor{
+                    id
+                }
+                timestamp
+                tick
+                baseLower
+                baseUpper
+                limitLower
+                limitUpper
+            }
+        }
+        """
         variables = {"timestampStart": self.timestamp_start}
-        response = await self.gamma_client.query(query, variables)
-        data = response["data"]["uniswapV3Hypervisors"]
+        hypervisors, rebalances = await asyncio.gather(
+            self.gamma_client.paginate_query(query, "id", variables),
+            self.gamma_client.paginate_query(query_rebalances, "id", variables),
+        )
 
-        return {hypervisor["id"]: self._reshape(hypervisor) for hypervisor in data}
+        rebalances_by_hypervisor = {}
+        for rebalance in rebalances:
+            rebalances_by_hypervisor.setdefault(
+                rebalance["hypervisor"]["id"], []
+            ).append(rebalance)
+
+        result = {}
+        for hypervisor in hypervisors:
+            hypervisor["rebalances"] = self._sort_rebalances(
+                rebalances_by_hypervisor.get(hypervisor["id"], [])
+                + hypervisor["rebalances"]
+            )
+            result[hypervisor["id"]] = self._reshape(hypervisor)
+        return result
 
     def _rebalance_ranges(self, rebalance_data):
         """Interpolate prices and rebalance ranges for complete set of data"""
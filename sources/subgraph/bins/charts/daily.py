@@ -12,9 +12,14 @@ class DailyChart:
     async def _get_all_flows(self):
         """Daily chart flows bar chart for hypervisors"""
         query = """
-        query hypervisorDaily($days: Int!){
+        query hypervisorDaily($days: Int!, $first: Int!, $paginate: String!){
             uniswapV3Hypervisors(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 dayData(
@@ -32,11 +37,11 @@ class DailyChart:
         }
         """
         variables = {"days": self.days}
-        response = await self.gamma_client.query(query, variables)
-        hypervisors = response["data"]["uniswapV3Hypervisors"]
-
         data = [
-            day_data for hypervisor in hypervisors for day_data in hypervisor["dayData"]
+            day_data
+            async for hypervisors in self.gamma_client.paginate(query, variables)
+            for hypervisor in hypervisors
+            for day_data in hypervisor["dayData"]
         ]
 
         return data
@@ -93,9 +98,14 @@ class DailyChart:
     async def tvl(self):
         """Total TVL chart broken down by hypervisor"""
         query = """
-        query hypervisorDaily($days: Int!){
+        query hypervisorDaily($days: Int!, $first: Int!, $paginate: String!){
             uniswapV3Hypervisors(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 pool{
@@ -125,17 +135,19 @@ class DailyChart:
         }
         """
         variables = {"days": self.days}
-        response = await self.gamma_client.query(query, variables)
-        data = response["data"]["uniswapV3Hypervisors"]
 
-        df_all = pd.DataFrame()
-        for hypervisor in data:
-            df_hypervisor = pd.DataFrame(hypervisor["dayData"], dtype=np.float64)
-            df_hypervisor["hypervisor"] = hypervisor["id"]
-            df_hypervisor[
-                "name"
-            ] = f"{hypervisor['pool']['token0']['symbol']}-{hypervisor['pool']['token1']['symbol']}"
-            df_all = pd.concat([df_all, df_hypervisor])
+        # build each page's frames while the next page downloads
+        df_hypervisors = []
+        async for hypervisors in self.gamma_client.paginate(query, variables):
+            for hypervisor in hypervisors:
+                df_hypervisor = pd.DataFrame(hypervisor["dayData"], dtype=np.float64)
+                df_hypervisor["hypervisor"] = hypervisor["id"]
+                df_hypervisor[
+                    "name"
+                ] = f"{hypervisor['pool']['token0']['symbol']}-{hypervisor['pool']['token1']['symbol']}"
+                df_hypervisors.append(df_hypervisor)
+
+        df_all = pd.concat(df_hypervisors) if df_hypervisors else pd.DataFrame()
 
         df_all.date = pd.to_datetime(df_all.date, unit="s").dt.strftime(
             "%Y-%m-%dT%H:%M:%SZ"
@@ -0,0 +1,160 @@
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable
+
+from sources.subgraph.bins.config import (
+    CIRCUIT_ERROR_RATE,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_OPEN_SECONDS,
+    CIRCUIT_SLOW_CALL,
+    CIRCUIT_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a url whose circuit is open"""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(f"Circuit open for {url}")
+        self.url = url
+
+
+class CircuitBreaker:
+    """
+    Stop calling a url while most of its recent calls fail or are too slow.
+
+    The circuit opens when, over the last CIRCUIT_WINDOW calls (and at least
+    CIRCUIT_MIN_CALLS), the share of failed calls reaches CIRCUIT_ERROR_RATE.
+    Calls slower than CIRCUIT_SLOW_CALL seconds count as failed.
+    After CIRCUIT_OPEN_SECONDS one probe call is let through (half open):
+    the circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        slow_call: float = CIRCUIT_SLOW_CALL,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+    ) -> None:
+        self.url = url
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """Calls would be rejected right now"""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at < self.open_seconds
+        return self.state == CircuitState.HALF_OPEN and self._probing
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        failed: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Call func through the circuit
+
+        Args:
+            func: coroutine function calling the url
+            failed: tells whether a result returned without raising is a failure
+
+        Raises:
+            CircuitOpenError: the circuit is open
+        """
+        self._before_call()
+        _startime = time.monotonic()
+        try:
+            result = await func()
+        except Exception:
+            self._record(False)
+            raise
+        except BaseException:
+            # cancelled calls say nothing about the url, let others probe
+            self._probing = False
+            raise
+        self._record(
+            time.monotonic() - _startime < self.slow_call
+            and not (failed and failed(result))
+        )
+        return result
+
+    def _before_call(self) -> None:
+        if self.is_open:
+            raise CircuitOpenError(self.url)
+        if self.state == CircuitState.OPEN:
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN:
+            self._probing = True
+
+    def _record(self, success: bool) -> None:
+        if self.state == CircuitState.HALF_OPEN:
+            self._probing = False
+            if not success:
+                self._open()
+                return
+            logger.info(f" Circuit closed for {self.url}")
+            self.state = CircuitState.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(success)
+        self._evaluate()
+
+    def _evaluate(self) -> None:
+        if self.state != CircuitState.CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        failed = self._outcomes.count(False)
+        if failed / len(self._outcomes) >= self.error_rate:
+            self._open()
+
+    def _open(self) -> None:
+        logger.warning(f" Circuit opened for {self.url}")
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state.value,
+            "calls": len(self._outcomes),
+            "failed": self._outcomes.count(False),
+        }
+
+
+class CircuitBreakers:
+    """One circuit breaker per url"""
+
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        if url not in self._breakers:
+            self._breakers[url] = CircuitBreaker(url)
+        return self._breakers[url]
+
+    def is_open(self, *urls: str) -> bool:
+        """Any of the urls has its circuit open"""
+        return any(self._breakers[url].is_open for url in urls if url in self._breakers)
+
+    def status(self) -> dict[str, dict]:
+        return {url: breaker.status() for url, breaker in self._breakers.items()}
+
+
+circuit_breakers = CircuitBreakers()
@@ -1,8 +1,16 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 
 from fastapi import Response
 
+from sources.subgraph.bins.circuit_breaker import circuit_breakers
+from sources.subgraph.bins.config import (
+    DEX_HYPEPOOL_SUBGRAPH_URLS,
+    DEX_SUBGRAPH_URLS,
+    GAMMA_SUBGRAPH_URLS,
+    RUN_HEDGE_DELAY,
+)
 from sources.subgraph.bins.enums import Chain, Protocol, QueryType
 
 from .subgraph_status import SubgraphStatusOutput, subgraph_status
@@ -17,16 +25,44 @@ class ExecutionOrderWrapper(ABC):
         self.response = response
         self.database_datetime: str = ""
 
-    async def run(self, first: QueryType = QueryType.SUBGRAPH):
+    async def run(
+        self,
+        first: QueryType = QueryType.SUBGRAPH,
+        hedge_delay: float | None = RUN_HEDGE_DELAY,
+    ):
+        """Get results from the first query type, falling back to the other one
+
+        Args:
+            first: query type tried first
+            hedge_delay: seconds to wait for the first query type before also
+                         starting the other one and keeping whichever succeeds
+                         first (0 runs both at once). None only runs the second
+                         one after the first fails.
+        """
         first_func = self._subgraph
         first_headers = self._set_subgraph_headers
 
         second_func = self._database
         second_headers = self._set_database_headers
 
+        if circuit_breakers.is_open(*self._subgraph_urls()):
+            # subgraph calls would be rejected, go straight to the database
+            logger.warning(
+                f" Subgraph circuit open for {self.protocol.value}-{self.chain.value},"
+                f" {self.__class__.__name__} runs database first"
+            )
+            first = QueryType.DATABASE
+            hedge_delay = None
+
         if first == QueryType.DATABASE:
             first_func, second_func = second_func, first_func
             first_headers, second_headers = second_headers, first_headers
+
+        if hedge_delay is not None:
+            return await self._run_hedged(
+                first_func, first_headers, second_func, second_headers, hedge_delay
+            )
+
         try:
             results = await first_func()
             first_headers()
@@ -37,6 +73,37 @@ class ExecutionOrderWrapper(ABC):
 
         return results
 
+    async def _run_hedged(
+        self, first_func, first_headers, second_func, second_headers, hedge_delay
+    ):
+        first_task = asyncio.ensure_future(first_func())
+        # headers to set when each task wins
+        tasks = {first_task: first_headers}
+        try:
+            # start the second query type once the first is slow or has failed
+            await asyncio.wait([first_task], timeout=hedge_delay)
+            if not first_task.done() or first_task.exception():
+                tasks[asyncio.ensure_future(second_func())] = second_headers
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.exception():
+                        tasks[task]()
+                        return task.result()
+                    logger.error(
+                        f"{task.get_coro().__qualname__} run failed: {task.exception()!r}"
+                    )
+            # both failed
+            raise task.exception()
+        finally:
+            # cancel the query type that lost the race
+            for task in tasks:
+                task.cancel()
+
     @abstractmethod
     async def _database(self):
         pass
@@ -51,6 +118,18 @@ class ExecutionOrderWrapper(ABC):
     async def _subgraph(self):
         pass
 
+    def _subgraph_urls(self) -> list[str]:
+        """Subgraphs _subgraph depends on"""
+        return [
+            urls[self.protocol][self.chain]
+            for urls in (
+                GAMMA_SUBGRAPH_URLS,
+                DEX_SUBGRAPH_URLS,
+                DEX_HYPEPOOL_SUBGRAPH_URLS,
+            )
+            if self.chain in urls.get(self.protocol, {})
+        ]
+
     def _set_subgraph_headers(self) -> None:
         if not self.response:
             return
@@ -1,4 +1,4 @@
-from fastapi_cache.decorator import cache
+from endpoint.cache import cache
 
 from sources.subgraph.bins.charts.base_range import BaseLimit
 from sources.subgraph.bins.charts.benchmark import Benchmark
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlparse
+
+from sources.subgraph.bins.config import (
+    DEPLOYMENT_MAX_PER_HOST,
+    DEPLOYMENT_TIMEOUT,
+    DEPLOYMENTS,
+    GAMMA_SUBGRAPH_URLS,
+)
+from sources.subgraph.bins.enums import Chain, Protocol
+
+logger = logging.getLogger(__name__)
+
+# concurrent deployment runs allowed against the same subgraph host
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+@dataclass
+class DeploymentResult:
+    protocol: Protocol
+    chain: Chain
+    result: Any = None
+    error: Exception | None = None
+    elapsed: float = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.protocol.value}-{self.chain.value}"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _host_semaphore(protocol: Protocol, chain: Chain) -> asyncio.Semaphore:
+    host = urlparse(GAMMA_SUBGRAPH_URLS[protocol][chain]).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(DEPLOYMENT_MAX_PER_HOST)
+    return _host_semaphores[host]
+
+
+async def _run_deployment(
+    func: Callable[[Protocol, Chain], Awaitable[Any]],
+    protocol: Protocol,
+    chain: Chain,
+    timeout: float,
+) -> DeploymentResult:
+    result = DeploymentResult(protocol=protocol, chain=chain)
+    async with _host_semaphore(protocol, chain):
+        _startime = time.perf_counter()
+        try:
+            result.result = await asyncio.wait_for(func(protocol, chain), timeout)
+        except asyncio.TimeoutError as err:
+            logger.warning(f" {result.name} deployment timed out after {timeout}s")
+            result.error = err
+        except Exception as err:
+            logger.exception(f" {result.name} deployment failed")
+            result.error = err
+        result.elapsed = time.perf_counter() - _startime
+
+    logger.debug(f" {result.name} deployment took {result.elapsed:.3f}s")
+    return result
+
+
+async def run_deployments(
+    func: Callable[[Protocol, Chain], Awaitable[Any]],
+    deployments: list[tuple[Protocol, Chain]] | None = None,
+    timeout: float = DEPLOYMENT_TIMEOUT,
+) -> list[DeploymentResult]:
+    """Run func for every deployment concurrently
+
+    Runs against the same subgraph host are bounded by DEPLOYMENT_MAX_PER_HOST and
+    each run is cancelled after timeout seconds, so one slow deployment
+    only drops its own result instead of stalling the rest.
+
+    Args:
+        func: coroutine function called with (protocol, chain)
+        deployments: defaults to all DEPLOYMENTS
+        timeout: seconds allowed per deployment
+
+    Returns:
+        list[DeploymentResult]: one per deployment, in the same order
+    """
+    return await asyncio.gather(
+        *[
+            _run_deployment(func, protocol, chain, timeout)
+            for protocol, chain in (deployments or DEPLOYMENTS)
+        ]
+    )
+
+
+def server_timing(results: list[DeploymentResult]) -> str:
+    """Per deployment latency as a Server-Timing header value"""
+    metrics = []
+    for result in results:
+        status = "ok" if result.ok else type(result.error).__name__
+        metrics.append(f'{result.name};dur={result.elapsed * 1000:.0f};desc="{status}"')
+    return ", ".join(metrics)
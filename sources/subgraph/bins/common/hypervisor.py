@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime, timedelta
 import logging
 
@@ -12,7 +11,10 @@ from sources.subgraph.bins.common import ExecutionOrderWrapper
 from sources.subgraph.bins.config import MONGO_DB_URL
 from sources.subgraph.bins.enums import Chain, Protocol
 from sources.subgraph.bins.hype_fees.fees import fees_all
-from sources.subgraph.bins.hype_fees.fees_yield import fee_returns_all
+from sources.subgraph.bins.hype_fees.fees_yield import (
+    fee_returns_all,
+    fee_returns_all_periods,
+)
 from sources.subgraph.bins.hype_fees.impermanent_divergence import (
     impermanent_divergence_all,
 )
@@ -131,32 +133,15 @@ class HypervisorsReturnsAllPeriods(ExecutionOrderWrapper):
         return result
 
     async def _subgraph(self):
-        daily, weekly, monthly = await asyncio.gather(
-            fee_returns_all(
-                self.protocol,
-                self.chain,
-                1,
-                self.hypervisors,
-                self.current_timestamp,
-                apr_type=self.apr_type,
-            ),
-            fee_returns_all(
-                self.protocol,
-                self.chain,
-                7,
-                self.hypervisors,
-                self.current_timestamp,
-                apr_type=self.apr_type,
-            ),
-            fee_returns_all(
-                self.protocol,
-                self.chain,
-                30,
-                self.hypervisors,
-                self.current_timestamp,
-                apr_type=self.apr_type,
-            ),
+        returns = await fee_returns_all_periods(
+            self.protocol,
+            self.chain,
+            [1, 7, 30],
+            self.hypervisors,
+            self.current_timestamp,
+            apr_type=self.apr_type,
         )
+        daily, weekly, monthly = returns[1], returns[7], returns[30]
 
         results = {}
         for hypervisor_id in daily.keys():
@@ -117,6 +117,9 @@ legacy_stats = {
 
 MONGO_DB_URL = get_config("MONGO_DB_URL")
 MONGO_DB_TIMEOUTMS = int(get_config("MONGO_DB_TIMEOUTMS"))
+MONGO_DB_THREADS = int(get_config("MONGO_DB_THREADS"))
+MONGO_DB_BULK_BATCH_SIZE = int(get_config("MONGO_DB_BULK_BATCH_SIZE"))
+MONGO_DB_BATCH_SIZE = int(get_config("MONGO_DB_BATCH_SIZE"))
 MONGO_DB_COLLECTIONS = {
     "static": {"id": True},  # no historic
     "returns": {"id": True},  # historic
@@ -140,8 +143,24 @@ GROSS_FEES_MAX = 10**6
 TVL_MAX = 100e6
 
 GQL_CLIENT_TIMEOUT = int(get_config("GQL_CLIENT_TIMEOUT"))
+GQL_POOL_LIMIT_PER_HOST = int(get_config("GQL_POOL_LIMIT_PER_HOST"))
+GQL_POOL_KEEPALIVE_TIMEOUT = int(get_config("GQL_POOL_KEEPALIVE_TIMEOUT"))
+
+DEPLOYMENT_TIMEOUT = int(get_config("DEPLOYMENT_TIMEOUT"))
+DEPLOYMENT_MAX_PER_HOST = int(get_config("DEPLOYMENT_MAX_PER_HOST"))
+
+CIRCUIT_WINDOW = int(get_config("CIRCUIT_WINDOW"))
+CIRCUIT_MIN_CALLS = int(get_config("CIRCUIT_MIN_CALLS"))
+CIRCUIT_ERROR_RATE = float(get_config("CIRCUIT_ERROR_RATE"))
+CIRCUIT_SLOW_CALL = float(get_config("CIRCUIT_SLOW_CALL"))
+CIRCUIT_OPEN_SECONDS = float(get_config("CIRCUIT_OPEN_SECONDS"))
 
 # What to run first, subgraph or database
 RUN_FIRST_QUERY_TYPE = QueryType(get_config("RUN_FIRST_QUERY_TYPE"))
+RUN_HEDGE_DELAY = (
+    None
+    if str(get_config("RUN_HEDGE_DELAY")).lower() == "off"
+    else float(get_config("RUN_HEDGE_DELAY"))
+)
 
 MASTERCHEF_ADDRESSES = get_config("MASTERCHEF_ADDRESSES")
@@ -6,6 +6,8 @@ XGAMMA_ADDRESS = "0x26805021988f1a45dc708b5fb75fc75f21747d8c"
 
 X128 = 2**128
 
+MIN_TICK = -887272
+
 DAYS_IN_PERIOD = {"daily": 1, "weekly": 7, "monthly": 30, "allTime": 2000}
 
 SECONDS_IN_DAYS = 3600
@@ -1,3 +1,5 @@
+from bisect import bisect_left, insort
+
 from gql.dsl import DSLQuery
 from httpx import HTTPStatusError
 
@@ -8,6 +10,77 @@ from sources.subgraph.bins.hype_fees.schema import Time
 from sources.subgraph.bins.subgraphs import SubgraphClient
 from sources.subgraph.bins.utils import estimate_block_from_timestamp_diff
 
+# max seconds between two known blocks to interpolate a timestamp in between
+MAX_INTERPOLATION_GAP = 3600
+# max seconds from a known block to estimate using the chain's block time
+MAX_ESTIMATION_DISTANCE = 300
+# known blocks kept per chain (oldest are evicted first)
+MAX_INDEX_ENTRIES = 5000
+
+
+class BlockTimestampIndex:
+    """Known timestamp -> block pairs of a chain
+
+    Resolves timestamps close to known blocks locally, either by interpolating
+    between the surrounding known blocks or by estimating from the nearest one.
+    """
+
+    def __init__(self, chain: Chain, max_entries: int = MAX_INDEX_ENTRIES) -> None:
+        self.chain = chain
+        self.max_entries = max_entries
+        self._timestamps: list[int] = []
+        self._blocks: dict[int, int] = {}
+
+    def add(self, time: Time) -> None:
+        if time.timestamp not in self._blocks:
+            insort(self._timestamps, time.timestamp)
+        self._blocks[time.timestamp] = time.block
+
+        while len(self._timestamps) > self.max_entries:
+            self._blocks.pop(self._timestamps.pop(0))
+
+    def get(self, timestamp: int) -> Time | None:
+        """Resolve timestamp from known blocks, None when none is close enough"""
+        if timestamp in self._blocks:
+            return Time(block=self._blocks[timestamp], timestamp=timestamp)
+
+        index = bisect_left(self._timestamps, timestamp)
+        before = self._timestamps[index - 1] if index > 0 else None
+        after = self._timestamps[index] if index < len(self._timestamps) else None
+
+        if before and after and after - before <= MAX_INTERPOLATION_GAP:
+            block_before = self._blocks[before]
+            block_after = self._blocks[after]
+            block = block_before + (block_after - block_before) * (
+                timestamp - before
+            ) // (after - before)
+            return Time(block=block, timestamp=timestamp)
+
+        nearest = min(
+            filter(None, (before, after)),
+            key=lambda known: abs(known - timestamp),
+            default=None,
+        )
+        if nearest and abs(nearest - timestamp) <= MAX_ESTIMATION_DISTANCE:
+            return Time(
+                block=estimate_block_from_timestamp_diff(
+                    self.chain, self._blocks[nearest], nearest, timestamp
+                ),
+                timestamp=timestamp,
+            )
+
+        return None
+
+
+# process wide block indexes
+block_indexes: dict[Chain, BlockTimestampIndex] = {}
+
+
+def get_block_index(chain: Chain) -> BlockTimestampIndex:
+    if chain not in block_indexes:
+        block_indexes[chain] = BlockTimestampIndex(chain)
+    return block_indexes[chain]
+
 
 class BlockRange:
     """Manage time ranges"""
@@ -23,6 +96,7 @@ class BlockRange:
         if subgraph_client:
             self._subgraph_client = subgraph_client
         self._llama_client = LlamaClient(chain)
+        self._block_index = get_block_index(chain)
 
     async def set_end(self, timestamp: int | None = None) -> None:
         """Set end time and block"""
@@ -39,12 +113,7 @@ class BlockRange:
         """Set initial timestamp and block using days before current time"""
         timestamp_start = self.end.timestamp - (days_ago * DAY_SECONDS)
         try:
-            response = await self._llama_client.block_from_timestamp(
-                timestamp_start, True
-            )
-            self.initial = Time(
-                block=response["height"], timestamp=response["timestamp"]
-            )
+            self.initial = await self._get_time_from_timestamp(timestamp_start)
         except HTTPStatusError:
             # Estimate start time if not found
             self.initial = Time(
@@ -58,8 +127,13 @@ class BlockRange:
             )
 
     async def _get_time_from_timestamp(self, timestamp: int) -> Time:
+        if time := self._block_index.get(timestamp):
+            return time
+
         response = await self._llama_client.block_from_timestamp(timestamp, True)
-        return Time(block=response["height"], timestamp=response["timestamp"])
+        time = Time(block=response["height"], timestamp=response["timestamp"])
+        self._block_index.add(time)
+        return time
 
     async def _query_current_time(self) -> Time:
         query = DSLQuery(
@@ -70,7 +144,9 @@ class BlockRange:
 
         response = await self._subgraph_client.execute(query)
 
-        return Time(
+        time = Time(
             block=response["_meta"]["block"]["number"],
             timestamp=response["_meta"]["block"]["timestamp"],
         )
+        self._block_index.add(time)
+        return time
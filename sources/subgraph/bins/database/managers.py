@@ -2,6 +2,10 @@ import logging
 import asyncio
 import sys
 from datetime import datetime, timezone
+from typing import Iterable
+
+from pymongo import DeleteMany, UpdateOne
+
 from sources.subgraph.bins.hypervisor import HypervisorInfo, HypervisorData
 from sources.subgraph.bins.masterchef_v2 import MasterchefV2Info
 from sources.subgraph.bins.hype_fees.data import FeeGrowthSnapshotData
@@ -18,6 +22,21 @@ from sources.common.database.common.collections_common import db_collections_com
 
 logger = logging.getLogger(__name__)
 
+# gamma_db_v1 collections and their indexes: { <field or compound fields>: <unique> }
+# compound indexes follow the query filters: equality fields first, then sort/range
+DB_COLLECTIONS = {
+    "static": {"id": True, ("chain", "protocol", "address"): False},
+    "returns": {
+        "id": True,
+        ("chain", "period", "block"): False,
+        ("chain", "period", "address", "timestamp"): False,
+    },
+    "latest_returns": {"id": True, ("chain", "protocol", "address"): False},
+    "allData": {"id": True},
+    "allRewards2": {"id": True, ("chain", "protocol", "datetime"): False},
+    "agregateStats": {"id": True, ("chain", "protocol", "datetime"): False},
+}
+
 
 class db_collection_manager(db_collections_common):
     def __init__(
@@ -56,7 +75,7 @@ class db_collection_manager(db_collections_common):
 class db_static_manager(db_collection_manager):
     def __init__(self, mongo_url: str):
         # Create a dictionary of collections
-        self.db_collections = {"static": {"id": True}}  # no historical data}
+        self.db_collections = {"static": DB_COLLECTIONS["static"]}  # no historical data
         # Set the database name
         self.db_name = "gamma_db_v1"
 
@@ -160,12 +179,24 @@ class db_returns_manager(db_collection_manager):
 
     """
 
+    # fields consumed by the queries, pushed down to the database as projections
+    STATIC_HYPERVISOR_FIELDS = ("symbol", "address", "chain", "pool", "protocol")
+    RETURNS_LATEST_FIELDS = (
+        "address",
+        "symbol",
+        "period",
+        "block",
+        "timestamp",
+        "fees.feeApr",
+        "fees.feeApy",
+        "fees.status",
+    )
+
     def __init__(self, mongo_url: str):
         # Create a dictionary of collections
         self.db_collections = {
-            "returns": {"id": True},
-            "static": {"id": True},
-            "allRewards2": {"id": True},
+            name: DB_COLLECTIONS[name]
+            for name in ("returns", "static", "allRewards2", "latest_returns")
         }
         # Set the database name
         self.db_name = "gamma_db_v1"
@@ -272,6 +303,7 @@ class db_returns_manager(db_collection_manager):
         periods: list[int] = None,
         retried: int = 0,
         current_timestamp: int = None,
+        new_ids: dict[str, bool] | None = None,
     ):
         """
         Args:
@@ -279,27 +311,55 @@ class db_returns_manager(db_collection_manager):
             protocol (Protocol):
             periods (list[int], optional): . Defaults to [1, 7, 14, 30].
             retried (int, optional): current number of retries . Defaults to 0.
+            new_ids (dict[str, bool], optional): <id>: whether the item was new to the database
+                                        before this feed saved anything. Kept across retries.
         """
         # set default periods
         if not periods:
             periods = [1, 7, 14, 30]
+        if new_ids is None:
+            new_ids = {}
 
         # create data
         try:
-            requests = [
-                self.save_items_to_database(
-                    data=await self.create_data(
-                        chain=chain,
-                        protocol=protocol,
-                        period_days=days,
-                        current_timestamp=current_timestamp,
-                    ),
-                    collection_name=self.db_collection_name,
+            # all periods are saved together with bulk writes
+            data = {}
+            for days in periods:
+                period_data = await self.create_data(
+                    chain=chain,
+                    protocol=protocol,
+                    period_days=days,
+                    current_timestamp=current_timestamp,
                 )
-                for days in periods
-            ]
+                data.update({item["id"]: item for item in period_data.values()})
+
+            # check ids before saving them: a retry after a successful save
+            # must still see its items as new
+            if unchecked_ids := [id for id in data if id not in new_ids]:
+                existing_ids = set(
+                    await self.get_distinct_items_from_database(
+                        field="id",
+                        collection_name=self.db_collection_name,
+                        condition={"id": {"$in": unchecked_ids}},
+                    )
+                )
+                new_ids.update({id: id not in existing_ids for id in unchecked_ids})
 
-            await asyncio.gather(*requests)
+            if failed := await self.save_items_to_database(
+                data=data, collection_name=self.db_collection_name
+            ):
+                logger.error(
+                    f" {failed} of {len(data)} {chain}'s {protocol} returns could not be saved to the {self.db_collection_name} collection."
+                )
+            # only items new to the database, so retried feeds are not averaged twice
+            if failed := await self.update_latest_returns(
+                chain=chain,
+                protocol=protocol,
+                returns=[item for id, item in data.items() if new_ids[id]],
+            ):
+                logger.error(
+                    f" {failed} latest_returns operations of {chain}'s {protocol} returns failed or were skipped. Rebuild them with database_feeder -m latest_returns"
+                )
 
         except Exception as err:
             # retry when possible
@@ -316,6 +376,7 @@ class db_returns_manager(db_collection_manager):
                     periods=periods,
                     retried=retried + 1,
                     current_timestamp=current_timestamp,
+                    new_ids=new_ids,
                 )
             elif err:
                 # {'message': 'Failed to decode `block.number` value: `subgraph QmXUphAvAEiGcTzdopmaEt8YDxZ2uEmLJcCQGcfaDvRhp2 only has data starting at block number 63562887 and data for block number 50084142 is therefore not available`'}
@@ -330,6 +391,13 @@ class db_returns_manager(db_collection_manager):
     async def get_hypervisors_average(
         self, chain: Chain, period: int = 0, protocol: Protocol = ""
     ) -> dict:
+        if latest := await self._get_latest_returns(
+            chain=chain,
+            protocol=protocol,
+            fields=self._latest_averages_fields(field="averages", period=period),
+        ):
+            return self._latest_averages(latest, field="averages", period=period)
+
         result = await self._get_data(
             query=self.query_hypervisors_average(
                 chain=chain, period=period, protocol=protocol
@@ -343,6 +411,17 @@ class db_returns_manager(db_collection_manager):
     async def get_hypervisors_returns_average(
         self, chain: Chain, period: int = 0, protocol: Protocol = ""
     ) -> dict:
+        if latest := await self._get_latest_returns(
+            chain=chain,
+            protocol=protocol,
+            fields=self._latest_averages_fields(
+                field="returns_averages", period=period
+            ),
+        ):
+            return self._latest_averages(
+                latest, field="returns_averages", period=period
+            )
+
         result = await self._get_data(
             query=self.query_hypervisors_returns_average(
                 chain=chain, period=period, protocol=protocol
@@ -360,6 +439,14 @@ class db_returns_manager(db_collection_manager):
         period: int = 0,
         protocol: Protocol = "",
     ) -> dict:
+        if latest := await self._get_latest_returns(
+            chain=chain,
+            protocol=protocol,
+            hypervisor_address=hypervisor_address,
+            fields=self._latest_averages_fields(field="averages", period=period),
+        ):
+            return self._latest_averages(latest, field="averages", period=period)
+
         result = await self._get_data(
             query=self.query_hypervisors_average(
                 chain=chain,
@@ -381,14 +468,26 @@ class db_returns_manager(db_collection_manager):
         hypervisor_address: str = "",
     ) -> dict:
         # query database
-        dbdata = await self._get_data(
-            query=self.query_last_returns(
-                chain=chain,
-                protocol=protocol,
-                period=period,
-                hypervisor_address=hypervisor_address,
+        if latest := await self._get_latest_returns(
+            chain=chain,
+            protocol=protocol,
+            hypervisor_address=hypervisor_address,
+            fields=(f"last.{period}",),
+        ):
+            dbdata = [
+                dict(item["last"][str(period)])
+                for item in latest
+                if str(period) in item.get("last", {})
+            ]
+        else:
+            dbdata = await self._get_data(
+                query=self.query_last_returns(
+                    chain=chain,
+                    protocol=protocol,
+                    period=period,
+                    hypervisor_address=hypervisor_address,
+                )
             )
-        )
         # set database last update field as the maximum date found within the items returned
         try:
             db_lastUpdate = max(x["timestamp"] for x in dbdata)
@@ -412,13 +511,21 @@ class db_returns_manager(db_collection_manager):
         self, chain: Chain, protocol: Protocol, hypervisor_address: str = ""
     ) -> dict:
         # query database
-        result = await self._get_data(
-            query=self.query_last_returns(
-                chain=chain,
-                protocol=protocol,
-                hypervisor_address=hypervisor_address,
+        if latest := await self._get_latest_returns(
+            chain=chain,
+            protocol=protocol,
+            hypervisor_address=hypervisor_address,
+            fields=("address", "last"),
+        ):
+            result = self._latest_last_returns(latest)
+        else:
+            result = await self._get_data(
+                query=self.query_last_returns(
+                    chain=chain,
+                    protocol=protocol,
+                    hypervisor_address=hypervisor_address,
+                )
             )
-        )
         # set database last update field as the maximum date found within the items returned
         try:
             db_lastUpdate = max(x["timestamp"] for x in result)
@@ -440,6 +547,239 @@ class db_returns_manager(db_collection_manager):
 
         return result
 
+    # latest returns: one document per hypervisor with its last returns and
+    # average returns of each period, updated by feed_db with each new item
+    async def update_latest_returns(
+        self, chain: Chain, protocol: Protocol, returns: list[dict]
+    ) -> int:
+        """Add returns items to the latest_returns collection
+
+        Returns:
+            int: number of write operations that failed
+        """
+        if not returns:
+            return 0
+        static = await self.get_items_from_database(
+            collection_name="static",
+            find={"id": {"$in": [f"{chain}_{item['address']}" for item in returns]}},
+            projection=self.fields_projection(self.STATIC_HYPERVISOR_FIELDS),
+        )
+        return await self.write_operations_to_database(
+            operations=self._latest_returns_operations(
+                chain=chain,
+                returns=returns,
+                static={item["address"]: item for item in static},
+                protocol=protocol,
+            ),
+            collection_name="latest_returns",
+            ordered=True,
+        )
+
+    async def rebuild_latest_returns(self, chain: Chain) -> int:
+        """Recreate the latest_returns documents of a chain from its returns history
+
+        Returns:
+            int: number of write operations that failed
+        """
+        static = await self.get_items_from_database(
+            collection_name="static",
+            find={"chain": chain},
+            projection=self.fields_projection(self.STATIC_HYPERVISOR_FIELDS),
+        )
+        returns = await self.get_items_from_database(
+            collection_name=self.db_collection_name,
+            find={"chain": chain},
+            projection=self.fields_projection(self.RETURNS_LATEST_FIELDS),
+            sort=[("block", 1)],
+        )
+        return await self.write_operations_to_database(
+            operations=[DeleteMany({"chain": chain})]
+            + self._latest_returns_operations(
+                chain=chain,
+                returns=returns,
+                static={item["address"]: item for item in static},
+            ),
+            collection_name="latest_returns",
+            ordered=True,
+        )
+
+    async def _get_latest_returns(
+        self,
+        chain: Chain,
+        protocol: Protocol = "",
+        hypervisor_address: str = "",
+        fields: Iterable[str] | None = None,
+    ) -> list[dict]:
+        """latest_returns documents, with only <fields> when supplied"""
+        _find = {"chain": chain}
+        if protocol:
+            _find["protocol"] = protocol
+        if hypervisor_address:
+            _find["address"] = hypervisor_address
+        return await self.get_items_from_database(
+            collection_name="latest_returns",
+            find=_find,
+            projection=self.fields_projection(fields) if fields else None,
+        )
+
+    @staticmethod
+    def _latest_returns_operations(
+        chain: Chain,
+        returns: list[dict],
+        static: dict[str, dict],
+        protocol: Protocol | None = None,
+    ) -> list[UpdateOne]:
+        """latest_returns updates for returns items, with the same outlier filters
+        as query_last_returns (0 < feeApy < 9) and
+        query_hypervisors_returns_average (0 < feeApy < 8)
+
+        Args:
+            chain (Chain):
+            returns (list[dict]): returns collection items
+            static (dict[str, dict]): static collection items by hypervisor address
+            protocol (Protocol, optional): defaults to the static item protocol
+        """
+        operations = []
+        for item in sorted(returns, key=lambda x: x["block"]):
+            fee_apr = item["fees"]["feeApr"]
+            fee_apy = item["fees"]["feeApy"]
+            if not isinstance(fee_apr, (int, float)) or not isinstance(
+                fee_apy, (int, float)
+            ):
+                continue
+
+            hypervisor = static.get(item["address"], {})
+            period = str(item["period"])
+            database_id = f"{chain}_{item['address']}"
+
+            update = {
+                "$set": {"chain": chain, "address": item["address"]},
+                "$inc": {},
+                "$min": {},
+                "$max": {},
+            }
+            if protocol or hypervisor.get("protocol"):
+                update["$set"]["protocol"] = protocol or hypervisor["protocol"]
+            if hypervisor:
+                update["$set"]["hypervisor"] = {
+                    field: hypervisor.get(field)
+                    for field in db_returns_manager.STATIC_HYPERVISOR_FIELDS
+                }
+
+            averages = ["averages"]
+            if 0 < fee_apy < 8:
+                averages.append("returns_averages")
+            for average in averages:
+                key = f"{average}.{period}"
+                update["$inc"] |= {
+                    f"{key}.items": 1,
+                    f"{key}.sum_feeApr": fee_apr,
+                    f"{key}.sum_feeApy": fee_apy,
+                }
+                update["$min"] |= {
+                    f"{key}.min_timestamp": item["timestamp"],
+                    f"{key}.min_block": item["block"],
+                }
+                update["$max"] |= {
+                    f"{key}.max_timestamp": item["timestamp"],
+                    f"{key}.max_block": item["block"],
+                }
+            operations.append(UpdateOne({"id": database_id}, update, upsert=True))
+
+            if 0 < fee_apy < 9:
+                # only replace the last item with a more recent one
+                operations.append(
+                    UpdateOne(
+                        {
+                            "id": database_id,
+                            f"last.{period}.block": {"$not": {"$gt": item["block"]}},
+                        },
+                        {
+                            "$set": {
+                                f"last.{period}": {
+                                    "address": item["address"],
+                                    "timestamp": item["timestamp"],
+                                    "block": item["block"],
+                                    "feeApr": fee_apr,
+                                    "feeApy": fee_apy,
+                                    "status": item["fees"].get("status"),
+                                    "symbol": hypervisor.get(
+                                        "symbol", item.get("symbol")
+                                    ),
+                                }
+                            }
+                        },
+                    )
+                )
+
+        return operations
+
+    @staticmethod
+    def _latest_averages_fields(field: str, period: int = 0) -> tuple[str, ...]:
+        """latest_returns fields used by _latest_averages"""
+        return ("address", "hypervisor", f"{field}.{period}" if period else field)
+
+    @staticmethod
+    def _latest_averages(latest: list[dict], field: str, period: int = 0) -> list[dict]:
+        """latest_returns documents as query_hypervisors_average and
+        query_hypervisors_returns_average results"""
+        result = []
+        for item in latest:
+            returns = {}
+            for key, average in item.get(field, {}).items():
+                if period != 0 and key != str(period):
+                    continue
+                returns[key] = {
+                    "period": int(key),
+                    "min_timestamp": average["min_timestamp"],
+                    "max_timestamp": average["max_timestamp"],
+                    "min_block": average["min_block"],
+                    "max_block": average["max_block"],
+                    "av_feeApr": average["sum_feeApr"] / average["items"],
+                    "av_feeApy": average["sum_feeApy"] / average["items"],
+                }
+                if field == "averages":
+                    # impermanent figures are not part of the returns items
+                    returns[key] |= {
+                        "av_imp_vs_hodl_usd": None,
+                        "av_imp_vs_hodl_deposited": None,
+                        "av_imp_vs_hodl_token0": None,
+                        "av_imp_vs_hodl_token1": None,
+                    }
+            if returns:
+                result.append(
+                    {
+                        "_id": item["address"],
+                        "hypervisor": item.get("hypervisor", {}),
+                        "returns": returns,
+                    }
+                )
+        return result
+
+    @staticmethod
+    def _latest_last_returns(latest: list[dict]) -> list[dict]:
+        """latest_returns documents as query_last_returns results of all periods"""
+
+        def _last(item: dict, period: str) -> dict:
+            last = item.get("last", {}).get(period, {})
+            return {
+                field: last[field]
+                for field in ("feeApr", "feeApy", "status", "symbol")
+                if field in last
+            }
+
+        return [
+            {
+                "_id": item["address"],
+                "daily": _last(item, "1"),
+                "weekly": _last(item, "7"),
+                "monthly": _last(item, "30"),
+                "allTime": _last(item, "30"),
+            }
+            for item in latest
+            if item.get("last")
+        ]
+
     async def get_impermanentDivergence_data(
         self,
         chain: Chain,
@@ -1322,7 +1662,7 @@ class db_returns_manager(db_collection_manager):
 class db_allData_manager(db_collection_manager):
     def __init__(self, mongo_url: str):
         # Create a dictionary of collections
-        self.db_collections = {"allData": {"id": True}}
+        self.db_collections = {"allData": DB_COLLECTIONS["allData"]}
         # Set the database name
         self.db_name = "gamma_db_v1"
 
@@ -1363,9 +1703,9 @@ class db_allData_manager(db_collection_manager):
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
-            await self.save_item_to_database(
-                data=await self.create_data(chain=chain, protocol=protocol),
-                collection_name=self.db_collection_name,
+            item = await self.create_data(chain=chain, protocol=protocol)
+            await self.save_items_to_database(
+                data={item["id"]: item}, collection_name=self.db_collection_name
             )
         except Exception:
             logger.warning(
@@ -1402,7 +1742,7 @@ class db_allData_manager(db_collection_manager):
 class db_allRewards2_manager(db_collection_manager):
     def __init__(self, mongo_url: str):
         # Create a dictionary of collections
-        self.db_collections = {"allRewards2": {"id": True}}
+        self.db_collections = {"allRewards2": DB_COLLECTIONS["allRewards2"]}
         # Set the database name
         self.db_name = "gamma_db_v1"
 
@@ -1451,9 +1791,9 @@ class db_allRewards2_manager(db_collection_manager):
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
-            await self.save_item_to_database(
-                data=await self.create_data(chain=chain, protocol=protocol),
-                collection_name=self.db_collection_name,
+            item = await self.create_data(chain=chain, protocol=protocol)
+            await self.save_items_to_database(
+                data={item["id"]: item}, collection_name=self.db_collection_name
             )
         except ValueError:
             pass
@@ -1589,7 +1929,7 @@ class db_allRewards2_manager(db_collection_manager):
 class db_aggregateStats_manager(db_collection_manager):
     def __init__(self, mongo_url: str):
         # Create a dictionary of collections
-        self.db_collections = {"agregateStats": {"id": True}}
+        self.db_collections = {"agregateStats": DB_COLLECTIONS["agregateStats"]}
         # Set the database name
         self.db_name = "gamma_db_v1"
 
@@ -1630,9 +1970,9 @@ class db_aggregateStats_manager(db_collection_manager):
     async def feed_db(self, chain: Chain, protocol: Protocol):
         try:
             # save as 1 item ( not separated)
-            await self.save_item_to_database(
-                data=await self.create_data(chain=chain, protocol=protocol),
-                collection_name=self.db_collection_name,
+            item = await self.create_data(chain=chain, protocol=protocol)
+            await self.save_items_to_database(
+                data={item["id"]: item}, collection_name=self.db_collection_name
             )
         except Exception:
             logger.warning(
@@ -214,6 +214,14 @@ async def feed_all():
     await feed_database_aggregateStats()
 
 
+async def rebuild_latest_returns():
+    """Recreate the latest returns collection from the whole returns history"""
+    returns_manager = db_returns_manager(mongo_url=MONGO_DB_URL)
+    for chain in {chain for chain, protocol in CHAINS_PROTOCOLS}:
+        logger.info(f" Rebuilding {chain} latest returns")
+        await returns_manager.rebuild_latest_returns(chain=chain)
+
+
 # Manual script execution
 async def feed_database_with_historic_data(from_datetime: datetime, periods=None):
     """Fill database with historic
@@ -295,7 +303,7 @@ def _cmd_print_help(err):
     print("Options:")
     print(" -s <start date> or --start=<start date>")
     print(" -m <option> or --manual=<option>")
-    print("           <option> being: secuence")
+    print("           <option> being: secuence or latest_returns")
     print(" ")
     print(" ")
     print(" ")
@@ -372,7 +380,10 @@ if __name__ == "__main__":
         # start time log
         _startime = datetime.now(timezone.utc)
 
-        asyncio.run(feed_all())
+        if cml_parameters["manual"] == "latest_returns":
+            asyncio.run(rebuild_latest_returns())
+        else:
+            asyncio.run(feed_all())
 
         # end time log
         logger.info(
@@ -1,7 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 from gql.dsl import DSLQuery
 
+from sources.subgraph.bins import PAGE_SIZE
 from sources.subgraph.bins.constants import BLOCK_TIME_SECONDS
 from sources.subgraph.bins.data import BlockRange
 from sources.subgraph.bins.enums import Chain, Protocol
@@ -9,10 +11,72 @@ from sources.subgraph.bins.hype_fees.schema import (
     FeesData,
     FeesDataRange,
     HypervisorStaticInfo,
+    Time,
 )
 from sources.subgraph.bins.subgraphs.hype_pool import HypePoolClient
 
 
+class HypervisorStaticCache:
+    """Hypervisor symbol and token decimals, which never change once deployed,
+    so they are queried only for hypervisors not seen before"""
+
+    def __init__(self) -> None:
+        self._static_data: dict[str, HypervisorStaticInfo] = {}
+
+    async def get(
+        self, client: HypePoolClient, hypervisor_ids: list[str]
+    ) -> dict[str, HypervisorStaticInfo]:
+        missing = list(
+            {
+                hypervisor_id
+                for hypervisor_id in hypervisor_ids
+                if hypervisor_id not in self._static_data
+            }
+        )
+        for start in range(0, len(missing), PAGE_SIZE):
+            await self._query_static_data(client, missing[start : start + PAGE_SIZE])
+
+        return {
+            hypervisor_id: self._static_data[hypervisor_id]
+            for hypervisor_id in hypervisor_ids
+            if hypervisor_id in self._static_data
+        }
+
+    async def _query_static_data(
+        self, client: HypePoolClient, hypervisor_ids: list[str]
+    ) -> None:
+        ds = client.data_schema
+        query = DSLQuery(
+            ds.Query.hypervisors(
+                first=len(hypervisor_ids), where={"id_in": hypervisor_ids}
+            ).select(
+                ds.Hypervisor.id,
+                ds.Hypervisor.symbol,
+                ds.Hypervisor.pool.select(
+                    ds.Pool.token0.select(ds.Token.decimals),
+                    ds.Pool.token1.select(ds.Token.decimals),
+                ),
+            )
+        )
+        response = await client.execute(query)
+
+        for hypervisor in response["hypervisors"]:
+            self._static_data[hypervisor["id"]] = HypervisorStaticInfo(
+                symbol=hypervisor["symbol"],
+                decimals0=hypervisor["pool"]["token0"]["decimals"],
+                decimals1=hypervisor["pool"]["token1"]["decimals"],
+            )
+
+
+static_caches: dict[tuple[Protocol, Chain], HypervisorStaticCache] = {}
+
+
+def get_static_cache(protocol: Protocol, chain: Chain) -> HypervisorStaticCache:
+    if (protocol, chain) not in static_caches:
+        static_caches[(protocol, chain)] = HypervisorStaticCache()
+    return static_caches[(protocol, chain)]
+
+
 class FeeGrowthDataABC(ABC):
     def __init__(self, protocol: Protocol, chain: Chain) -> None:
         self.protocol = protocol
@@ -105,15 +169,54 @@ class FeeGrowthDataABC(ABC):
             total_supply_decimals=18 if hypervisor.get("totalSupply") else 0,
         )
 
-    def _extract_static_data(self, hypervisor_static_data: dict) -> None:
-        self._static_data = {
-            hypervisor["id"]: HypervisorStaticInfo(
-                symbol=hypervisor["symbol"],
-                decimals0=hypervisor["pool"]["token0"]["decimals"],
-                decimals1=hypervisor["pool"]["token1"]["decimals"],
-            )
-            for hypervisor in hypervisor_static_data
-        }
+    def _hypervisor_fees_data(self, hypervisor: dict, time: Time) -> FeesData:
+        """FeesData from a hypervisors query at a given block"""
+        return self._init_fees_data(
+            hypervisor=hypervisor,
+            hypervisor_id=hypervisor["id"],
+            block=time.block,
+            timestamp=time.timestamp,
+            current_tick=hypervisor["pool"]["currentTick"],
+            price_0=hypervisor["pool"]["token0"]["priceUSD"],
+            price_1=hypervisor["pool"]["token1"]["priceUSD"],
+            fee_growth_global_0=hypervisor["pool"]["feeGrowthGlobal0X128"],
+            fee_growth_global_1=hypervisor["pool"]["feeGrowthGlobal1X128"],
+        )
+
+    def _snapshot_fees_data(self, hypervisor_id: str, snapshot: dict) -> list[FeesData]:
+        """FeesData of the current and previous block of a fee snapshot"""
+        current_block = snapshot["currentBlock"]
+        previous_block = snapshot["previousBlock"]
+        return [
+            self._init_fees_data(
+                hypervisor=current_block,
+                hypervisor_id=hypervisor_id,
+                block=snapshot["blockNumber"],
+                timestamp=snapshot["timestamp"],
+                current_tick=current_block["tick"],
+                price_0=current_block["price0"],
+                price_1=current_block["price1"],
+                fee_growth_global_0=current_block["feeGrowthGlobal0X128"],
+                fee_growth_global_1=current_block["feeGrowthGlobal1X128"],
+            ),
+            self._init_fees_data(
+                hypervisor=previous_block,
+                hypervisor_id=hypervisor_id,
+                block=int(snapshot["blockNumber"])
+                - 1,  # Previous block is 1 block before
+                timestamp=int(snapshot["timestamp"]) - BLOCK_TIME_SECONDS[self.chain],
+                current_tick=previous_block["tick"],
+                price_0=previous_block["price0"],
+                price_1=previous_block["price1"],
+                fee_growth_global_0=previous_block["feeGrowthGlobal0X128"],
+                fee_growth_global_1=previous_block["feeGrowthGlobal1X128"],
+            ),
+        ]
+
+    async def _load_static_data(self, hypervisors: list[dict]) -> None:
+        self._static_data = await get_static_cache(self.protocol, self.chain).get(
+            self.hype_pool_client, [hypervisor["id"] for hypervisor in hypervisors]
+        )
 
 
 class FeeGrowthData(FeeGrowthDataABC):
@@ -121,23 +224,15 @@ class FeeGrowthData(FeeGrowthDataABC):
         await self.time_range.set_end(timestamp)
 
     async def get_data(self, hypervisors: list[str] | None = None) -> None:
-        self.data = self._transform_data(await self._query_data(hypervisors))
+        query_data = await self._query_data(hypervisors)
+        await self._load_static_data(query_data["hypervisors"])
+        self.data = self._transform_data(query_data)
 
     async def _query_data(self, hypervisors: list[str] | None = None) -> dict:
         ds = self.hype_pool_client.data_schema
         hypervisor_filter = {"where": {"id_in": hypervisors}} if hypervisors else {}
 
         query = DSLQuery(
-            ds.Query.hypervisors(**hypervisor_filter)
-            .alias("static")
-            .select(
-                ds.Hypervisor.id,
-                ds.Hypervisor.symbol,
-                ds.Hypervisor.pool.select(
-                    ds.Pool.token0.select(ds.Token.decimals),
-                    ds.Pool.token1.select(ds.Token.decimals),
-                ),
-            ),
             ds.Query.hypervisors(
                 **({"block": {"number": self.time_range.end.block}} | hypervisor_filter)
             ).select(self.hype_pool_client.hypervisor_fields_fragment()),
@@ -148,7 +243,6 @@ class FeeGrowthData(FeeGrowthDataABC):
         return response
 
     def _transform_data(self, query_data) -> dict[str, FeesData]:
-        self._extract_static_data(query_data["static"])
         return {
             hypervisor["id"]: self._init_fees_data(
                 hypervisor=hypervisor,
@@ -174,23 +268,15 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
 
     async def get_data(self, hypervisors: list[str] | None = None) -> None:
         """Query data and tranfrom to FeesData Class"""
-        self.data = self._transform_data(await self._query_data(hypervisors))
+        query_data = await self._query_data(hypervisors)
+        await self._load_static_data(query_data["latest"])
+        self.data = self._transform_data(query_data)
 
     async def _query_data(self, hypervisors: list[str] | None = None) -> dict:
         ds = self.hype_pool_client.data_schema
         hypervisor_filter = {"where": {"id_in": hypervisors}} if hypervisors else {}
 
         query = DSLQuery(
-            ds.Query.hypervisors(**hypervisor_filter)
-            .alias("static")
-            .select(
-                ds.Hypervisor.id,
-                ds.Hypervisor.symbol,
-                ds.Hypervisor.pool.select(
-                    ds.Pool.token0.select(ds.Token.decimals),
-                    ds.Pool.token1.select(ds.Token.decimals),
-                ),
-            ),
             ds.Query.hypervisors(
                 **({"block": {"number": self.time_range.end.block}} | hypervisor_filter)
             )
@@ -233,25 +319,10 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
 
     def _transform_data(self, query_data: dict) -> dict[str, list[FeesData]]:
         transformed_data = {}
-        self._extract_static_data(query_data["static"])
         # Add latest row
         for hypervisor_latest in query_data["latest"]:
             transformed_data[hypervisor_latest["id"]] = [
-                self._init_fees_data(
-                    hypervisor=hypervisor_latest,
-                    hypervisor_id=hypervisor_latest["id"],
-                    block=self.time_range.end.block,
-                    timestamp=self.time_range.end.timestamp,
-                    current_tick=hypervisor_latest["pool"]["currentTick"],
-                    price_0=hypervisor_latest["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_latest["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_latest["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_latest["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
-                )
+                self._hypervisor_fees_data(hypervisor_latest, self.time_range.end)
             ]
 
         # Add initial row
@@ -260,21 +331,7 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                 continue
 
             transformed_data[hypervisor_initial["id"]].append(
-                self._init_fees_data(
-                    hypervisor=hypervisor_initial,
-                    hypervisor_id=hypervisor_initial["id"],
-                    block=self.time_range.initial.block,
-                    timestamp=self.time_range.initial.timestamp,
-                    current_tick=hypervisor_initial["pool"]["currentTick"],
-                    price_0=hypervisor_initial["pool"]["token0"]["priceUSD"],
-                    price_1=hypervisor_initial["pool"]["token1"]["priceUSD"],
-                    fee_growth_global_0=hypervisor_initial["pool"][
-                        "feeGrowthGlobal0X128"
-                    ],
-                    fee_growth_global_1=hypervisor_initial["pool"][
-                        "feeGrowthGlobal1X128"
-                    ],
-                )
+                self._hypervisor_fees_data(hypervisor_initial, self.time_range.initial)
             )
 
         for hypervisor_snapshot in query_data["snapshots"]:
@@ -282,63 +339,157 @@ class FeeGrowthSnapshotData(FeeGrowthDataABC):
                 if not transformed_data.get(hypervisor_snapshot["id"]):
                     continue
 
-                # Add current block
-                current_block = snapshot["currentBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
-                    self._init_fees_data(
-                        hypervisor=current_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
-                        block=snapshot["blockNumber"],
-                        timestamp=snapshot["timestamp"],
-                        current_tick=current_block["tick"],
-                        price_0=current_block["price0"],
-                        price_1=current_block["price1"],
-                        fee_growth_global_0=current_block["feeGrowthGlobal0X128"],
-                        fee_growth_global_1=current_block["feeGrowthGlobal1X128"],
-                    )
-                )
-                # Add previous block
-                previous_block = snapshot["previousBlock"]
-                transformed_data[hypervisor_snapshot["id"]].append(
-                    self._init_fees_data(
-                        hypervisor=previous_block,
-                        hypervisor_id=hypervisor_snapshot["id"],
-                        block=int(snapshot["blockNumber"])
-                        - 1,  # Previous block is 1 block before
-                        timestamp=int(snapshot["timestamp"])
-                        - BLOCK_TIME_SECONDS[self.chain],
-                        current_tick=previous_block["tick"],
-                        price_0=previous_block["price0"],
-                        price_1=previous_block["price1"],
-                        fee_growth_global_0=previous_block["feeGrowthGlobal0X128"],
-                        fee_growth_global_1=previous_block["feeGrowthGlobal1X128"],
-                    )
+                # Add current and previous block
+                transformed_data[hypervisor_snapshot["id"]].extend(
+                    self._snapshot_fees_data(hypervisor_snapshot["id"], snapshot)
                 )
         return transformed_data
 
 
-class ImpermanentDivergenceData(FeeGrowthDataABC):
-    async def init_time(self, days_ago: int, end_timestamp: int | None = None):
+class FeeGrowthSnapshotPeriodsData(FeeGrowthDataABC):
+    """Fee growth snapshot data for several periods ending at the same block
+
+    Static and latest data are queried once for all periods, and snapshots
+    only for the longest period, since it contains all the shorter ones.
+    """
+
+    def __init__(self, protocol: Protocol, chain: Chain) -> None:
+        super().__init__(protocol, chain)
+        self.time_ranges: dict[int, BlockRange] = {}
+
+    async def init_time(self, periods: list[int], end_timestamp: int | None = None):
         await self.time_range.set_end(end_timestamp)
-        await self.time_range.set_initial_with_days_ago(days_ago)
+
+        self.time_ranges = {
+            days: BlockRange(self.chain, self.hype_pool_client) for days in periods
+        }
+        for time_range in self.time_ranges.values():
+            time_range.end = self.time_range.end
+        await asyncio.gather(
+            *[
+                time_range.set_initial_with_days_ago(days)
+                for days, time_range in self.time_ranges.items()
+            ]
+        )
+
+        # overall range spans the longest period
+        self.time_range.initial = min(
+            (time_range.initial for time_range in self.time_ranges.values()),
+            key=lambda time: time.timestamp,
+        )
 
     async def get_data(self, hypervisors: list[str] | None = None) -> None:
-        self.data = self._transform_data(await self._query_data(hypervisors))
+        """Query data and tranfrom to FeesData Class for each period"""
+        query_data = await self._query_data(hypervisors)
+        await self._load_static_data(query_data["latest"])
+        self.data = self._transform_data(query_data)
 
     async def _query_data(self, hypervisors: list[str] | None = None) -> dict:
         ds = self.hype_pool_client.data_schema
         hypervisor_filter = {"where": {"id_in": hypervisors}} if hypervisors else {}
+
         query = DSLQuery(
+            ds.Query.hypervisors(
+                **({"block": {"number": self.time_range.end.block}} | hypervisor_filter)
+            )
+            .alias("latest")
+            .select(self.hype_pool_client.hypervisor_fields_fragment()),
+            *[
+                ds.Query.hypervisors(
+                    **(
+                        {"block": {"number": time_range.initial.block}}
+                        | hypervisor_filter
+                    )
+                )
+                .alias(f"initial_{days}")
+                .select(self.hype_pool_client.hypervisor_fields_fragment())
+                for days, time_range in self.time_ranges.items()
+            ],
             ds.Query.hypervisors(**hypervisor_filter)
-            .alias("static")
+            .alias("snapshots")
             .select(
                 ds.Hypervisor.id,
-                ds.Hypervisor.symbol,
-                ds.Hypervisor.pool.select(
-                    ds.Pool.token0.select(ds.Token.decimals),
-                    ds.Pool.token1.select(ds.Token.decimals),
+                ds.Hypervisor.feeSnapshots(
+                    first=1000,
+                    orderBy="timestamp",
+                    orderDirection="desc",
+                    where={
+                        "timestamp_gte": self.time_range.initial.timestamp,
+                        "timestamp_lte": self.time_range.end.timestamp,
+                    },
+                ).select(
+                    ds.FeeSnapshot.blockNumber,
+                    ds.FeeSnapshot.timestamp,
+                    ds.FeeSnapshot.currentBlock.select(
+                        self.hype_pool_client.block_snapshot_fields_fragment()
+                    ),
+                    ds.FeeSnapshot.previousBlock.select(
+                        self.hype_pool_client.block_snapshot_fields_fragment()
+                    ),
                 ),
             ),
+            ds.Query._meta.select(self.hype_pool_client.meta_fields_fragment()),
+        )
+
+        response = await self.hype_pool_client.execute(query)
+        return response
+
+    def _transform_data(self, query_data: dict) -> dict[int, dict[str, list[FeesData]]]:
+        latest = {
+            hypervisor["id"]: self._hypervisor_fees_data(
+                hypervisor, self.time_range.end
+            )
+            for hypervisor in query_data["latest"]
+        }
+
+        # (snapshot timestamp, rows) so each period can pick its own snapshots
+        snapshots = {
+            hypervisor["id"]: [
+                (
+                    int(snapshot["timestamp"]),
+                    self._snapshot_fees_data(hypervisor["id"], snapshot),
+                )
+                for snapshot in hypervisor["feeSnapshots"]
+            ]
+            for hypervisor in query_data["snapshots"]
+            if hypervisor["id"] in latest
+        }
+
+        transformed_data = {}
+        for days, time_range in self.time_ranges.items():
+            initial = {
+                hypervisor["id"]: self._hypervisor_fees_data(
+                    hypervisor, time_range.initial
+                )
+                for hypervisor in query_data[f"initial_{days}"]
+            }
+            transformed_data[days] = {}
+            for hypervisor_id, latest_row in latest.items():
+                rows = [latest_row]
+                if hypervisor_id in initial:
+                    rows.append(initial[hypervisor_id])
+                for timestamp, snapshot_rows in snapshots.get(hypervisor_id, []):
+                    if timestamp >= time_range.initial.timestamp:
+                        rows.extend(snapshot_rows)
+                transformed_data[days][hypervisor_id] = rows
+
+        return transformed_data
+
+
+class ImpermanentDivergenceData(FeeGrowthDataABC):
+    async def init_time(self, days_ago: int, end_timestamp: int | None = None):
+        await self.time_range.set_end(end_timestamp)
+        await self.time_range.set_initial_with_days_ago(days_ago)
+
+    async def get_data(self, hypervisors: list[str] | None = None) -> None:
+        query_data = await self._query_data(hypervisors)
+        await self._load_static_data(query_data["latest"])
+        self.data = self._transform_data(query_data)
+
+    async def _query_data(self, hypervisors: list[str] | None = None) -> dict:
+        ds = self.hype_pool_client.data_schema
+        hypervisor_filter = {"where": {"id_in": hypervisors}} if hypervisors else {}
+        query = DSLQuery(
             ds.Query.hypervisors(
                 **({"block": {"number": self.time_range.end.block}} | hypervisor_filter)
             )
@@ -359,8 +510,6 @@ class ImpermanentDivergenceData(FeeGrowthDataABC):
         return response
 
     def _transform_data(self, query_data: dict) -> dict[str, FeesDataRange]:
-        self._extract_static_data(query_data["static"])
-
         # Transform list to dict for easier lookup in the next step
         initial_data = {hype["id"]: hype for hype in query_data["initial"]}
 
@@ -1,5 +1,8 @@
 import logging
 
+import numpy as np
+
+from sources.subgraph.bins.constants import X128
 from sources.subgraph.bins.enums import Chain, PositionType, Protocol
 from sources.subgraph.bins.hype_fees.data import FeeGrowthData
 from sources.subgraph.bins.hype_fees.schema import FeesData, UncollectedFees, _TokenPair
@@ -7,6 +10,8 @@ from sources.subgraph.bins.utils import sub_in_256
 
 logger = logging.getLogger(__name__)
 
+UINT256 = 2**256
+
 
 class Fees:
     def __init__(self, data: FeesData, protocol: Protocol, chain: Chain):
@@ -110,6 +115,126 @@ class Fees:
         )
 
 
+class FeesBatch:
+    """Uncollected fees of many FeesData at once
+
+    Same arithmetic as Fees, over arrays of all rows instead of one row at a
+    time. uint256 values are kept in object arrays of python ints so
+    wraparound stays exact.
+    """
+
+    def __init__(self, data: list[FeesData]):
+        self.data = data
+        self.current_tick = np.array([row.current_tick for row in data], dtype=np.int64)
+        self.fee_growth_global0 = self._uint_array(
+            [row.fee_growth_global.value0 for row in data]
+        )
+        self.fee_growth_global1 = self._uint_array(
+            [row.fee_growth_global.value1 for row in data]
+        )
+        self.decimals0 = self._uint_array([10**row.decimals.value0 for row in data])
+        self.decimals1 = self._uint_array([10**row.decimals.value1 for row in data])
+
+    @staticmethod
+    def _uint_array(values: list[int]) -> np.ndarray:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+
+    def total_amounts(self) -> tuple[np.ndarray, np.ndarray]:
+        """Decimal adjusted total fees (uncollected + owed, base + limit) per row,
+        matching Fees.fee_amounts().total.amount"""
+        base0, base1 = self._calc_position_fees(PositionType.BASE)
+        limit0, limit1 = self._calc_position_fees(PositionType.LIMIT)
+
+        total0 = (
+            base0
+            + self._uint_array(
+                [row.base_position.tokens_owed.value0.raw for row in self.data]
+            )
+            + limit0
+            + self._uint_array(
+                [row.limit_position.tokens_owed.value0.raw for row in self.data]
+            )
+        )
+        total1 = (
+            base1
+            + self._uint_array(
+                [row.base_position.tokens_owed.value1.raw for row in self.data]
+            )
+            + limit1
+            + self._uint_array(
+                [row.limit_position.tokens_owed.value1.raw for row in self.data]
+            )
+        )
+
+        return (
+            (total0 / self.decimals0 / X128).astype(np.float64),
+            (total1 / self.decimals1 / X128).astype(np.float64),
+        )
+
+    def _calc_position_fees(
+        self, position_type: PositionType
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if position_type == PositionType.BASE:
+            positions = [row.base_position for row in self.data]
+        elif position_type == PositionType.LIMIT:
+            positions = [row.limit_position for row in self.data]
+
+        liquidity = self._uint_array([position.liquidity for position in positions])
+        tick_lower = np.array(
+            [position.tick_lower.tick_index for position in positions], dtype=np.int64
+        )
+        tick_upper = np.array(
+            [position.tick_upper.tick_index for position in positions], dtype=np.int64
+        )
+        above_lower = self.current_tick >= tick_lower
+        above_upper = self.current_tick >= tick_upper
+
+        fees = []
+        for token, fee_growth_global in (
+            (0, self.fee_growth_global0),
+            (1, self.fee_growth_global1),
+        ):
+            outside_lower = self._uint_array(
+                [
+                    getattr(position.tick_lower.fee_growth_outside, f"value{token}")
+                    for position in positions
+                ]
+            )
+            outside_upper = self._uint_array(
+                [
+                    getattr(position.tick_upper.fee_growth_outside, f"value{token}")
+                    for position in positions
+                ]
+            )
+            fee_growth_inside = self._uint_array(
+                [
+                    getattr(position.fee_growth_inside, f"value{token}")
+                    for position in positions
+                ]
+            )
+
+            fee_growth_below_pos = np.where(
+                above_lower,
+                outside_lower,
+                (fee_growth_global - outside_lower) % UINT256,
+            )
+            fee_growth_above_pos = np.where(
+                above_upper,
+                (fee_growth_global - outside_upper) % UINT256,
+                outside_upper,
+            )
+            fees_accum_now = (
+                (fee_growth_global - fee_growth_below_pos) % UINT256
+                - fee_growth_above_pos
+            ) % UINT256
+
+            fees.append(liquidity * ((fees_accum_now - fee_growth_inside) % UINT256))
+
+        return fees[0], fees[1]
+
+
 async def fees_all(
     protocol: Protocol,
     chain: Chain,
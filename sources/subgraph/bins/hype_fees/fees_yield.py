@@ -1,13 +1,15 @@
 import logging
 
 import numpy as np
-from pandas import DataFrame
 
 from sources.subgraph.bins.constants import DAY_SECONDS, YEAR_SECONDS
 from sources.subgraph.bins.enums import Chain, Protocol
-from sources.subgraph.bins.hype_fees.data import FeeGrowthSnapshotData
-from sources.subgraph.bins.hype_fees.fees import Fees
-from sources.subgraph.bins.hype_fees.schema import FeesData, FeesSnapshot, FeeYield
+from sources.subgraph.bins.hype_fees.data import (
+    FeeGrowthSnapshotData,
+    FeeGrowthSnapshotPeriodsData,
+)
+from sources.subgraph.bins.hype_fees.fees import FeesBatch
+from sources.subgraph.bins.hype_fees.schema import FeesData, FeeYield
 
 logger = logging.getLogger(__name__)
 
@@ -34,11 +36,10 @@ class FeesYield:
         # default apr typeis Liquidity Providers feeApr (users)
         apr_type = apr_type or "users"
 
-        snapshots = [self.get_fees(entry) for entry in self.data]
-        df_snapshots = DataFrame(snapshots, dtype=np.float64)
+        snapshots = self.get_fees()
 
         #  Require at least two rows to calculate yield
-        if len(df_snapshots) < 2:
+        if len(snapshots["block"]) < 2:
             logger.info("No hypervisor data - skipping calculations")
             return FeeYield(
                 apr=0,
@@ -46,112 +47,101 @@ class FeesYield:
                 status="Insufficient Data",
             )
 
-        df_snapshots = df_snapshots.set_index("block").sort_index()
-        # fee % is 1 / fee or 1/10 if fee > 100
-        df_snapshots["fee_calc"] = df_snapshots["fee"].apply(
-            lambda x: 1 / x if x < 100 else 1 / 10
-        )
-        df_snapshots["gamma_fee_0"] = df_snapshots.total_fees_0 * df_snapshots.fee_calc
-        df_snapshots["gamma_fee_1"] = df_snapshots.total_fees_1 * df_snapshots.fee_calc
-        df_snapshots["lp_fee_0"] = df_snapshots.total_fees_0 - df_snapshots.gamma_fee_0
-        df_snapshots["lp_fee_1"] = df_snapshots.total_fees_1 - df_snapshots.gamma_fee_1
-
-        df_snapshots["elapsed_time"] = df_snapshots.timestamp.diff()
-
-        # Choose fee growth based on aprType
-        if apr_type == "users":
-            df_snapshots["fee0_growth"] = df_snapshots.lp_fee_0.diff().clip(lower=0)
-            df_snapshots["fee1_growth"] = df_snapshots.lp_fee_1.diff().clip(lower=0)
-        elif apr_type == "gamma":
-            df_snapshots["fee0_growth"] = df_snapshots.gamma_fee_0.diff().clip(lower=0)
-            df_snapshots["fee1_growth"] = df_snapshots.gamma_fee_1.diff().clip(lower=0)
-        elif apr_type == "all":
-            df_snapshots["fee0_growth"] = df_snapshots.total_fees_0.diff().clip(lower=0)
-            df_snapshots["fee1_growth"] = df_snapshots.total_fees_1.diff().clip(lower=0)
-
-        df_snapshots["fee_growth_usd"] = (
-            df_snapshots.fee0_growth * df_snapshots.price_0
-            + df_snapshots.fee1_growth * df_snapshots.price_1
-        )
-        df_snapshots["period_yield"] = (
-            df_snapshots.fee_growth_usd / df_snapshots.tvl_usd
-        )
-        df_snapshots["yield_per_day"] = (
-            df_snapshots.period_yield * YEAR_SECONDS / df_snapshots.elapsed_time
-        )
-
-        has_outlier = (df_snapshots.yield_per_day > YIELD_PER_DAY_MAX).any()
-        df_snapshots = df_snapshots[df_snapshots.yield_per_day < YIELD_PER_DAY_MAX]
-
-        df_snapshots["total_period_seconds"] = df_snapshots.elapsed_time.cumsum()
-        df_snapshots["cum_fee_return"] = (1 + df_snapshots.period_yield).cumprod() - 1
-
-        df_returns = df_snapshots[["total_period_seconds", "cum_fee_return"]].tail(1)
-
-        # This is a failsafe for if there are outliers
-        if df_returns.empty:
-            logger.debug("Empty returns")
-            return FeeYield(
-                apr=0,
-                apy=0,
-                status="Insufficient good data",
+        order = np.argsort(snapshots["block"], kind="stable")
+        snapshots = {key: values[order] for key, values in snapshots.items()}
+
+        # divisions by zero and overflows end up as inf/nan and are handled below
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            # fee % is 1 / fee or 1/10 if fee > 100
+            fee = snapshots["fee"]
+            fee_calc = np.where(fee < 100, 1 / fee, 1 / 10)
+            gamma_fee_0 = snapshots["total_fees_0"] * fee_calc
+            gamma_fee_1 = snapshots["total_fees_1"] * fee_calc
+
+            # Choose fee growth based on aprType
+            fees_0, fees_1 = {
+                "users": (
+                    snapshots["total_fees_0"] - gamma_fee_0,
+                    snapshots["total_fees_1"] - gamma_fee_1,
+                ),
+                "gamma": (gamma_fee_0, gamma_fee_1),
+                "all": (snapshots["total_fees_0"], snapshots["total_fees_1"]),
+            }[apr_type]
+
+            # first row has no previous one, diffs start from the second row
+            elapsed_time = np.diff(snapshots["timestamp"])
+            fee0_growth = np.diff(fees_0).clip(min=0)
+            fee1_growth = np.diff(fees_1).clip(min=0)
+
+            fee_growth_usd = (
+                fee0_growth * snapshots["price_0"][1:]
+                + fee1_growth * snapshots["price_1"][1:]
             )
+            period_yield = fee_growth_usd / snapshots["tvl_usd"][1:]
+            yield_per_day = period_yield * YEAR_SECONDS / elapsed_time
 
-        # Extrapolate linearly to annual rate
-        df_returns["fee_apr"] = df_returns.cum_fee_return * (
-            YEAR_SECONDS / df_returns.total_period_seconds
-        )
+            has_outlier = (yield_per_day > YIELD_PER_DAY_MAX).any()
+            good_data = yield_per_day < YIELD_PER_DAY_MAX
 
-        # Extrapolate by compounding
-        df_returns["fee_apy"] = (
-            1
-            + df_returns.cum_fee_return
-            * (DAY_SECONDS / df_returns.total_period_seconds)
-        ) ** 365 - 1
+            # This is a failsafe for if there are outliers
+            if not good_data.any():
+                logger.debug("Empty returns")
+                return FeeYield(
+                    apr=0,
+                    apy=0,
+                    status="Insufficient good data",
+                )
 
-        df_returns = df_returns.fillna(0).replace({np.inf: 0, -np.inf: 0})
+            total_period_seconds = elapsed_time[good_data].sum()
+            cum_fee_return = (1 + period_yield[good_data]).prod() - 1
 
-        returns = df_returns.to_dict("records")[0]
+            # Extrapolate linearly to annual rate
+            fee_apr = cum_fee_return * (YEAR_SECONDS / total_period_seconds)
 
-        returns["fee_apr"] = max(returns["fee_apr"], 0)
-        returns["fee_apy"] = max(returns["fee_apy"], 0)
+            # Extrapolate by compounding
+            fee_apy = (
+                1 + cum_fee_return * (DAY_SECONDS / total_period_seconds)
+            ) ** 365 - 1
+
+        fee_apr = fee_apr if np.isfinite(fee_apr) else 0
+        fee_apy = fee_apy if np.isfinite(fee_apy) else 0
 
         return FeeYield(
-            apr=returns["fee_apr"] if returns["fee_apr"] else 0,
-            apy=returns["fee_apy"] if returns["fee_apy"] else 0,
+            apr=max(fee_apr, 0),
+            apy=max(fee_apy, 0),
             status="Outlier removed" if has_outlier else "Good",
         )
 
-    def get_fees(self, fees_data: FeesData) -> FeesSnapshot:
-        fees = Fees(fees_data, self.protocol, self.chain)
-        fee_amounts = fees.fee_amounts()
-
-        return FeesSnapshot(
-            block=fees_data.block,
-            timestamp=fees_data.timestamp,
-            fee=fees_data.fee,
-            tvl_usd=fees_data.tvl_usd,
-            total_fees_0=fee_amounts.total.amount.value0,
-            total_fees_1=fee_amounts.total.amount.value1,
-            price_0=fees_data.price.value0,
-            price_1=fees_data.price.value1,
-        )
+    def get_fees(self) -> dict[str, np.ndarray]:
+        """FeesSnapshot fields of every row as columns"""
+        total_fees_0, total_fees_1 = FeesBatch(self.data).total_amounts()
+
+        return {
+            "block": np.array([row.block for row in self.data], dtype=np.float64),
+            "timestamp": np.array(
+                [row.timestamp for row in self.data], dtype=np.float64
+            ),
+            "fee": np.array([row.fee for row in self.data], dtype=np.float64),
+            "tvl_usd": np.array([row.tvl_usd for row in self.data], dtype=np.float64),
+            "total_fees_0": total_fees_0,
+            "total_fees_1": total_fees_1,
+            "price_0": np.array(
+                [row.price.value0 for row in self.data], dtype=np.float64
+            ),
+            "price_1": np.array(
+                [row.price.value1 for row in self.data], dtype=np.float64
+            ),
+        }
 
 
-async def fee_returns_all(
+def _fee_returns(
     protocol: Protocol,
     chain: Chain,
-    days: int,
-    hypervisors: list[str] | None = None,
-    current_timestamp: int | None = None,
+    data: dict[str, list[FeesData]],
     apr_type: str | None = None,
 ) -> dict[str, dict]:
-    fees_data = FeeGrowthSnapshotData(protocol, chain)
-    await fees_data.init_time(days_ago=days, end_timestamp=current_timestamp)
-    await fees_data.get_data(hypervisors)
-
     results = {}
-    for hypervisor_id, fees_data in fees_data.data.items():
+    for hypervisor_id, fees_data in data.items():
         fees_yield = FeesYield(fees_data, protocol, chain)
 
         returns = (
@@ -166,3 +156,38 @@ async def fee_returns_all(
             "status": returns.status,
         }
     return results
+
+
+async def fee_returns_all(
+    protocol: Protocol,
+    chain: Chain,
+    days: int,
+    hypervisors: list[str] | None = None,
+    current_timestamp: int | None = None,
+    apr_type: str | None = None,
+) -> dict[str, dict]:
+    fees_data = FeeGrowthSnapshotData(protocol, chain)
+    await fees_data.init_time(days_ago=days, end_timestamp=current_timestamp)
+    await fees_data.get_data(hypervisors)
+
+    return _fee_returns(protocol, chain, fees_data.data, apr_type)
+
+
+async def fee_returns_all_periods(
+    protocol: Protocol,
+    chain: Chain,
+    periods: list[int],
+    hypervisors: list[str] | None = None,
+    current_timestamp: int | None = None,
+    apr_type: str | None = None,
+) -> dict[int, dict[str, dict]]:
+    """fee_returns_all for several periods ending at the same block,
+    using a single subgraph query"""
+    fees_data = FeeGrowthSnapshotPeriodsData(protocol, chain)
+    await fees_data.init_time(periods=periods, end_timestamp=current_timestamp)
+    await fees_data.get_data(hypervisors)
+
+    return {
+        days: _fee_returns(protocol, chain, data, apr_type)
+        for days, data in fees_data.data.items()
+    }
@@ -4,7 +4,7 @@ from sources.subgraph.bins.constants import X128
 from sources.subgraph.bins.schema import ValueWithDecimal
 
 
-@dataclass
+@dataclass(slots=True)
 class Time:
     block: int
     timestamp: int
@@ -14,7 +14,7 @@ class Time:
         self.timestamp = int(self.timestamp)
 
 
-@dataclass
+@dataclass(slots=True)
 class _TokenPair:
     value0: ValueWithDecimal = field(init=False)
     value1: ValueWithDecimal = field(init=False)
@@ -28,7 +28,7 @@ class _TokenPair:
         self.value1 = ValueWithDecimal(raw=raw1, decimals=decimals1)
 
 
-@dataclass
+@dataclass(slots=True)
 class _TokenPairInt:
     value0: int
     value1: int
@@ -38,7 +38,7 @@ class _TokenPairInt:
         self.value1 = int(self.value1)
 
 
-@dataclass
+@dataclass(slots=True)
 class _TokenPairDecimals:
     value0: float
     value1: float
@@ -48,7 +48,7 @@ class _TokenPairDecimals:
         self.value1 = float(self.value1)
 
 
-@dataclass
+@dataclass(slots=True)
 class HypervisorStaticInfo:
     symbol: str
     decimals: _TokenPairInt = field(init=False)
@@ -59,7 +59,7 @@ class HypervisorStaticInfo:
         self.decimals = _TokenPairInt(value0=decimals0, value1=decimals1)
 
 
-@dataclass
+@dataclass(slots=True)
 class _TickData:
     tick_index: int
     fee_growth_outside: _TokenPairInt = field(init=False)
@@ -78,7 +78,7 @@ class _TickData:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class _PositionData:
     liquidity: int
     tokens_owed: _TokenPair = field(init=False)
@@ -136,7 +136,7 @@ class _PositionData:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class FeesData:
     block: int
     timestamp: int
@@ -181,8 +181,7 @@ class FeesData:
     tick_index_upper_limit: InitVar[int]
     fee_growth_outside_upper_limit0: InitVar[int]
     fee_growth_outside_upper_limit1: InitVar[int]
-    total_supply: ValueWithDecimal | None = field(init=False)
-    total_supply: InitVar[int | None] = None
+    total_supply: ValueWithDecimal | None = None
     total_supply_decimals: InitVar[int] = 0
 
     def __post_init__(
@@ -217,7 +216,6 @@ class FeesData:
         tick_index_upper_limit: int,
         fee_growth_outside_upper_limit0: int,
         fee_growth_outside_upper_limit1: int,
-        total_supply: int | None = None,
         total_supply_decimals: int = 0,
     ):
         self.block = int(self.block)
@@ -265,10 +263,11 @@ class FeesData:
             decimals0=decimals0,
             decimals1=decimals1,
         )
-        if total_supply:
-            self.total_supply = ValueWithDecimal(
-                raw=total_supply, decimals=total_supply_decimals
-            )
+        self.total_supply = (
+            ValueWithDecimal(raw=self.total_supply, decimals=total_supply_decimals)
+            if self.total_supply
+            else None
+        )
 
     def update_tvl(self, tvl0: int, tvl1: int, tvl_usd: int) -> None:
         self.tvl = self.tvl = _TokenPair(
@@ -280,13 +279,13 @@ class FeesData:
         self.tvl_usd = tvl_usd
 
 
-@dataclass
+@dataclass(slots=True)
 class FeesDataRange:
     initial: FeesData
     latest: FeesData
 
 
-@dataclass
+@dataclass(slots=True)
 class _FeeAmounts:
     amount: _TokenPairDecimals = field(init=False)
     amount_x128: _TokenPair = field(init=False)
@@ -331,7 +330,7 @@ class _FeeAmounts:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionFees:
     fees: _FeeAmounts = field(init=False)
     owed: _FeeAmounts = field(init=False)
@@ -389,7 +388,7 @@ class PositionFees:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class UncollectedFees:
     base: PositionFees = field(init=False)
     limit: PositionFees = field(init=False)
@@ -463,7 +462,7 @@ class UncollectedFees:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class FeesSnapshot:
     block: int
     timestamp: int
@@ -485,7 +484,7 @@ class FeesSnapshot:
         self.price_1 = float(self.price_1)
 
 
-@dataclass
+@dataclass(slots=True)
 class FeeYield:
     apr: float
     apy: float
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta
 import logging
 
@@ -84,9 +85,14 @@ class HypervisorData:
 
     async def _get_all_data(self):
         query_basics = """
-        {
+        query hypervisors($first: Int!, $paginate: String!){
             uniswapV3Hypervisors(
-                first:1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 created
@@ -123,26 +129,10 @@ class HypervisorData:
         }
         """
 
-        basics_response = await self.gamma_client.query(query_basics)
-
-        # TODO: hardcoded hypervisor address matches more than one -->
-        #       MAINNET(xPSDN-ETH1) and OPTIMISM(xUSDC-DAI05)
-        # TODO: specify chain on hardcoded overrides
-        for hypervisor in basics_response["data"]["uniswapV3Hypervisors"]:
-            if hypervisor["id"] == "0x0ec4a47065bf52e1874d2491d4deeed3c638c75f":
-                hypervisor["grossFeesClaimedUSD"] = str(
-                    float(hypervisor["grossFeesClaimedUSD"]) - 238300
-                )
-                hypervisor["feesReinvestedUSD"] = str(
-                    float(hypervisor["feesReinvestedUSD"]) - 214470
-                )
-
-        basics = basics_response["data"]["uniswapV3Hypervisors"]
-        pool_addresses = [hypervisor["pool"]["id"] for hypervisor in basics]
-
         query_pool = """
-        query slot0($pools: [String!]!){
+        query slot0($pools: [String!]!, $first: Int!){
             pools(
+                first: $first
                 where: {
                     id_in: $pools
                 }
@@ -156,10 +146,41 @@ class HypervisorData:
             }
         }
         """
-        variables = {"pools": pool_addresses}
-        pools_response = await self.uniswap_client.query(query_pool, variables)
-        pools_data = pools_response["data"]["pools"]
-        pools = {pool.pop("id"): pool for pool in pools_data}
+
+        basics = []
+        pools_requests = []
+        async for hypervisors in self.gamma_client.paginate(query_basics):
+            # TODO: hardcoded hypervisor address matches more than one -->
+            #       MAINNET(xPSDN-ETH1) and OPTIMISM(xUSDC-DAI05)
+            # TODO: specify chain on hardcoded overrides
+            for hypervisor in hypervisors:
+                if hypervisor["id"] == "0x0ec4a47065bf52e1874d2491d4deeed3c638c75f":
+                    hypervisor["grossFeesClaimedUSD"] = str(
+                        float(hypervisor["grossFeesClaimedUSD"]) - 238300
+                    )
+                    hypervisor["feesReinvestedUSD"] = str(
+                        float(hypervisor["feesReinvestedUSD"]) - 214470
+                    )
+
+            # query this page's pools while the next page downloads
+            pool_addresses = list(
+                {hypervisor["pool"]["id"] for hypervisor in hypervisors}
+            )
+            pools_requests.append(
+                asyncio.ensure_future(
+                    self.uniswap_client.query(
+                        query_pool,
+                        {"pools": pool_addresses, "first": len(pool_addresses)},
+                    )
+                )
+            )
+            basics += hypervisors
+
+        pools = {}
+        for pools_response in await asyncio.gather(*pools_requests):
+            pools.update(
+                {pool.pop("id"): pool for pool in pools_response["data"]["pools"]}
+            )
 
         self.basics_data = basics
         self.pools_data = pools
@@ -1,13 +1,16 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class ValueWithDecimal:
     raw: int
-    adjusted: float = field(init=False)
     decimals: int
 
     def __post_init__(self):
         self.raw = int(self.raw)
         self.decimals = int(self.decimals)
-        self.adjusted = self.raw / 10**self.decimals
\ No newline at end of file
+
+    @property
+    def adjusted(self) -> float:
+        # only a few values per row are ever read adjusted, compute on access
+        return self.raw / 10**self.decimals
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sources.subgraph.bins import UniswapV3Client
+from sources.subgraph.bins.constants import MIN_TICK
 from sources.subgraph.bins.enums import Chain, Protocol
 
 
@@ -31,13 +32,15 @@ class SimulatorData:
 
     async def _get_pool_ticks(self, pool_address: str):
         query = """
-        query ticks($poolAddress: String!){
+        query ticks($poolAddress: String!, $first: Int!, $paginate: BigInt!){
             ticks(
-                first: 1000
+                first: $first
                 where: {
                     poolAddress: $poolAddress
+                    tickIdx_gt: $paginate
                 }
                 orderBy: tickIdx
+                orderDirection: asc
             ) {
                 tickIdx
                 liquidityNet
@@ -49,8 +52,13 @@ class SimulatorData:
         variables = {
             "poolAddress": pool_address.lower(),
         }
-        response = await self.uniswap_client.query(query, variables)
-        self.tick_data = response["data"]["ticks"]
+        self.tick_data = [
+            tick
+            async for ticks in self.uniswap_client.paginate(
+                query, variables, paginate_variable="tickIdx", cursor=str(MIN_TICK - 1)
+            )
+            for tick in ticks
+        ]
 
     async def _get_pool_from_tokens(self, token0: str, token1: str):
         query = """
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.callers = 1
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for a key is in flight,
+    callers asking for the same key await the same task instead of starting
+    a new one.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[Any]],
+        share: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """Run func once for all concurrent callers of key
+
+        Args:
+            key: identifies identical calls
+            func: coroutine function producing the result
+            share: applied to the result of each caller when the call was shared,
+                   so callers can safely mutate what they get (i.e. copy.deepcopy)
+
+        Returns:
+            func result
+        """
+        flight = self._flights.get(key)
+        if flight:
+            flight.callers += 1
+        else:
+            flight = _Flight(asyncio.ensure_future(self._call(key, func)))
+            self._flights[key] = flight
+
+        # shield so a cancelled caller does not cancel the call for the others
+        result = await asyncio.shield(flight.task)
+
+        if share and flight.callers > 1:
+            return share(result)
+        return result
+
+    async def _call(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await func()
+        finally:
+            # forget the flight before its result is published so late callers
+            # always start a new call instead of joining a finished one
+            self._flights.pop(key, None)
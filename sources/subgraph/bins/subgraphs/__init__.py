@@ -1,11 +1,22 @@
+import asyncio
+import copy
 import logging
-from functools import wraps
+from functools import lru_cache, wraps
 
+import aiohttp
 from gql import Client as GqlClient
+from gql.client import AsyncClientSession
 from gql.dsl import DSLFragment, DSLQuery, DSLSchema, dsl_gql
 from gql.transport.aiohttp import AIOHTTPTransport, log as requests_logger
+from graphql import DocumentNode, GraphQLSchema, build_ast_schema, parse, print_ast
 
-from sources.subgraph.bins.config import GQL_CLIENT_TIMEOUT
+from sources.subgraph.bins.circuit_breaker import circuit_breakers
+from sources.subgraph.bins.config import (
+    GQL_CLIENT_TIMEOUT,
+    GQL_POOL_KEEPALIVE_TIMEOUT,
+    GQL_POOL_LIMIT_PER_HOST,
+)
+from sources.subgraph.bins.singleflight import SingleFlight
 
 requests_logger.setLevel(logging.WARNING)
 
@@ -28,34 +39,132 @@ def fragment(fragment_function):
     return wrapper
 
 
+@lru_cache(maxsize=None)
+def load_schema(schema_path: str) -> tuple[GraphQLSchema, DSLSchema]:
+    """
+    Parse a schema file once per process.
+    The resulting schema objects are immutable and shared among all clients
+    """
+    with open(schema_path, encoding="utf-8") as schema_file:
+        schema = build_ast_schema(parse(schema_file.read()))
+    return schema, DSLSchema(schema)
+
+
 class AsyncGqlClient(GqlClient):
     """Subclass of gql Client that defaults to AIOHTTPTransport"""
 
-    def __init__(self, url: str, schema, execute_timeout: int) -> None:
+    def __init__(
+        self,
+        url: str,
+        schema: GraphQLSchema,
+        execute_timeout: int,
+        client_session_args: dict | None = None,
+    ) -> None:
         self.url = url
         super().__init__(
             schema=schema,
-            transport=AIOHTTPTransport(url=url),
+            transport=AIOHTTPTransport(
+                url=url, client_session_args=client_session_args
+            ),
             execute_timeout=execute_timeout,
         )
 
 
+class GqlSessionPool:
+    """
+    Long lived gql sessions, one per subgraph url.
+    Each session owns a keep-alive connection pool so queries reuse sockets
+    instead of paying a new TCP+TLS handshake every time.
+    The pool is opened/closed with the app lifetime; when it is not open
+    (scripts, other event loops) clients use a short lived session per query.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, AsyncGqlClient] = {}
+        self._sessions: dict[str, AsyncClientSession] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Sessions can only be used from the loop that opened the pool"""
+        try:
+            return self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    async def open(self) -> None:
+        if self.is_open:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+
+    async def session(self, url: str, schema: GraphQLSchema) -> AsyncClientSession:
+        """Get the persistent session for url, connecting it on first use"""
+        if url in self._sessions:
+            return self._sessions[url]
+
+        async with self._lock:
+            if url not in self._sessions:
+                client = AsyncGqlClient(
+                    url=url,
+                    schema=schema,
+                    execute_timeout=GQL_CLIENT_TIMEOUT,
+                    client_session_args={
+                        "connector": aiohttp.TCPConnector(
+                            limit_per_host=GQL_POOL_LIMIT_PER_HOST,
+                            keepalive_timeout=GQL_POOL_KEEPALIVE_TIMEOUT,
+                        )
+                    },
+                )
+                self._sessions[url] = await client.connect_async()
+                self._clients[url] = client
+
+        return self._sessions[url]
+
+    async def close(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._sessions.clear()
+        self._loop = None
+        await asyncio.gather(
+            *[client.close_async() for client in clients], return_exceptions=True
+        )
+
+
+session_pool = GqlSessionPool()
+# identical in-flight queries share one execution
+query_flights = SingleFlight()
+
+
 class SubgraphClient:
     """Subgraph base client to manage query execution and shared fragments"""
 
     def __init__(self, url: str, schema_path: str) -> None:
-        with open(schema_path, encoding="utf-8") as schema_file:
-            schema = schema_file.read()
+        schema, self.data_schema = load_schema(schema_path)
         self.client = AsyncGqlClient(
             url=url, schema=schema, execute_timeout=GQL_CLIENT_TIMEOUT
         )
-        self.data_schema = DSLSchema(self.client.schema)
         self._fragment_dependencies: list[DSLFragment] = []
         self._fragments_used: list[str] = []
 
     async def execute(self, query: DSLQuery) -> dict:
         """Executes query and returns result"""
         gql = dsl_gql(*self._fragment_dependencies, query)
+        # callers may mutate results, so shared results are copied
+        return await query_flights.run(
+            key=(self.client.url, print_ast(gql)),
+            func=lambda: circuit_breakers.get(self.client.url).call(
+                lambda: self._execute(gql)
+            ),
+            share=copy.deepcopy,
+        )
+
+    async def _execute(self, gql: DocumentNode) -> dict:
+        if session_pool.is_open:
+            session = await session_pool.session(self.client.url, self.client.schema)
+            return await session.execute(gql)
+
         async with self.client as session:
             result = await session.execute(gql)
             return result
@@ -5,9 +5,9 @@ from sources.subgraph.bins.subgraphs import SubgraphClient
 
 class GammaClient(SubgraphClient):
     def __init__(self, protocol: Protocol, chain: Chain):
+        self.protocol = protocol
+        self.chain = chain
         super().__init__(
-            protocol=protocol,
-            chain=chain,
             url=GAMMA_SUBGRAPH_URLS[protocol][chain],
             schema_path="sources/subgraph/bins/subgraphs/gamma/schema.graphql",
         )
@@ -28,9 +28,14 @@ class TopLevelData:
     async def get_hypervisor_data(self):
         """Get hypervisor IDs"""
         query = """
-        {
+        query hypervisors($first: Int!, $paginate: String!){
             uniswapV3Hypervisors(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 grossFeesClaimedUSD
@@ -38,27 +43,35 @@ class TopLevelData:
             }
         }
         """
-        response = await self.gamma_client.query(query)
-        return response["data"]["uniswapV3Hypervisors"]
+        return await self.gamma_client.paginate_query(query, "id")
 
     async def get_pool_data(self):
         query = """
-        {
+        query pools($first: Int!, $paginate: String!){
             uniswapV3Pools(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
             }
         }
         """
-        response = await self.gamma_client.query(query)
-        return response["data"]["uniswapV3Pools"]
+        return await self.gamma_client.paginate_query(query, "id")
 
     async def _get_all_stats_data(self):
         query = """
-        query allStats($grossFeesMax: Int!) {
+        query allStats($grossFeesMax: Int!, $first: Int!, $paginate: String!) {
             uniswapV3Hypervisors(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
+                where: {
+                    id_gt: $paginate
+                }
             ){
                 id
                 grossFeesClaimedUSD
@@ -71,27 +84,32 @@ class TopLevelData:
                     netFeesUSD
                 }
             }
-            uniswapV3Pools(
-                first: 1000
-            ){
-                id
-            }
         }
         """
 
         variables = {"grossFeesMax": GROSS_FEES_MAX}
-        response = await self.gamma_client.query(query, variables)
-        self.all_stats_data = response["data"]
+        hypervisors, pools = await asyncio.gather(
+            self.gamma_client.paginate_query(query, "id", variables),
+            self.get_pool_data(),
+        )
+        self.all_stats_data = {
+            "uniswapV3Hypervisors": hypervisors,
+            "uniswapV3Pools": pools,
+        }
 
     async def get_recent_rebalance_data(self, hours=24):
         query = """
-        query rebalances($timestamp_start: Int!){
+        query rebalances($timestamp_start: Int!, $first: Int!, $paginate: String!){
             uniswapV3Rebalances(
-                first: 1000
+                first: $first
+                orderBy: id
+                orderDirection: asc
                 where: {
                     timestamp_gte: $timestamp_start
+                    id_gt: $paginate
                 }
             ) {
+                id
                 grossFeesUSD
                 protocolFeesUSD
                 netFeesUSD
@@ -100,8 +118,7 @@ class TopLevelData:
         """
         timestamp_start = timestamp_ago(timedelta(hours=hours))
         variables = {"timestamp_start": timestamp_start}
-        response = await self.gamma_client.query(query, variables)
-        return response["data"]["uniswapV3Rebalances"]
+        return await self.gamma_client.paginate_query(query, "id", variables)
 
     def _all_stats(self):
         """
@@ -155,7 +172,11 @@ class TopLevelData:
             self.get_recent_rebalance_data(hours), gamma_price()
         )
         gamma_price_usd = gamma_prices["token_in_usdc"]
-        df_fees = DataFrame(data, dtype=np.float64)
+        df_fees = DataFrame(
+            data,
+            columns=["grossFeesUSD", "protocolFeesUSD", "netFeesUSD"],
+            dtype=np.float64,
+        )
 
         df_fees["grossFeesGAMMA"] = df_fees.grossFeesUSD / gamma_price_usd
         df_fees["protocolFeesGAMMA"] = df_fees.protocolFeesUSD / gamma_price_usd
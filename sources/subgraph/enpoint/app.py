@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
@@ -5,7 +7,15 @@ from fastapi_cache.backends.inmemory import InMemoryBackend
 from fastapi.middleware.cors import CORSMiddleware
 from endpoint.config.cache import CHARTS_CACHE_TIMEOUT
 
-from sources.subgraph.enpoint.routers import build_routers, build_routers_compatible
+from endpoint.warmer import cache_warmer
+from sources.common.database.common.db_managers import mongo_pool
+from sources.common.database.indexes import create_indexes
+from sources.subgraph.bins.subgraphs import session_pool
+from sources.subgraph.enpoint.routers import (
+    build_routers,
+    build_routers_compatible,
+    build_warm_targets,
+)
 
 
 def create_app(
@@ -33,5 +43,16 @@ def create_app(
     @app.on_event("startup")
     async def startup():
         FastAPICache.init(InMemoryBackend())
+        await session_pool.open()
+        cache_warmer.start(build_warm_targets())
+        # index builds may take a while on big collections: do not delay startup
+        app.state.create_indexes = asyncio.create_task(create_indexes())
+
+    @app.on_event("shutdown")
+    async def shutdown():
+        await cache_warmer.stop()
+        app.state.create_indexes.cancel()
+        await session_pool.close()
+        mongo_pool.close()
 
     return app
@@ -1,7 +1,7 @@
-import asyncio
 from fastapi import Response, APIRouter, status
-from fastapi_cache.decorator import cache
+from endpoint.cache import cache
 
+from endpoint.warmer import WarmTarget
 from endpoint.routers.template import (
     router_builder_generalTemplate,
     router_builder_baseTemplate,
@@ -10,6 +10,7 @@ from sources.subgraph.bins.common import (
     hypervisor,
     analytics,
     aggregate_stats,
+    deployments,
     masterchef,
     masterchef_v2,
     users,
@@ -36,6 +37,9 @@ from endpoint.config.cache import (
 
 RUN_FIRST = RUN_FIRST_QUERY_TYPE
 
+# deployment served at the root of the old endpoint by subgraph_router_builder_compatible
+COMPATIBLE_DEPLOYMENT = (Protocol.UNISWAP, Chain.MAINNET)
+
 
 # Route builders
 
@@ -151,10 +155,11 @@ def build_routers_compatible() -> list:
     )
 
     # add Mainnet
+    protocol, chain = COMPATIBLE_DEPLOYMENT
     routes.append(
         subgraph_router_builder_compatible(
-            dex=Protocol.UNISWAP,
-            chain=Chain.MAINNET,
+            dex=protocol,
+            chain=chain,
             tags=["Mainnet"],
         )
     )
@@ -233,6 +238,63 @@ def build_routers_compatible() -> list:
     return routes
 
 
+def build_warm_targets() -> list[WarmTarget]:
+    """Hot cached endpoints the cache warmer keeps fresh for every deployment"""
+    targets = []
+
+    for protocol, chain in DEPLOYMENTS:
+        route_builder = subgraph_router_builder(dex=protocol, chain=chain)
+        deployment = f"{protocol.value}-{chain.value}"
+        for endpoint, kwargs in (
+            (subgraph_router_builder.hypervisors_all_data, {}),
+            (subgraph_router_builder.hypervisors_returns, {"apr_type": None}),
+            (subgraph_router_builder.hypervisors_feeReturns_daily, {}),
+            (subgraph_router_builder.hypervisors_feeReturns_weekly, {}),
+            (subgraph_router_builder.hypervisors_feeReturns_monthly, {}),
+            (subgraph_router_builder.hypervisors_aggregate_stats, {}),
+        ):
+            targets.append(
+                WarmTarget(
+                    name=f"{deployment}:{endpoint.__name__}",
+                    warm=endpoint.warm,
+                    args=(route_builder,),
+                    kwargs={"response": Response()} | kwargs,
+                )
+            )
+
+        if (protocol, chain) == COMPATIBLE_DEPLOYMENT:
+            targets.append(
+                WarmTarget(
+                    name=f"{deployment}:compatible:dashboard",
+                    warm=subgraph_router_builder_compatible.dashboard.warm,
+                    args=(
+                        subgraph_router_builder_compatible(dex=protocol, chain=chain),
+                    ),
+                    kwargs={"response": Response(), "period": "weekly"},
+                )
+            )
+
+    all_deployments = subgraph_router_builder_allDeployments(tags=[])
+    targets.append(
+        WarmTarget(
+            name="allDeployments:aggregate_stats",
+            warm=subgraph_router_builder_allDeployments.aggregate_stats.warm,
+            args=(all_deployments,),
+            kwargs={"response": Response()},
+        )
+    )
+    targets.append(
+        WarmTarget(
+            name="allDeployments:dashboard",
+            warm=subgraph_router_builder_allDeployments.dashboard.warm,
+            args=(all_deployments,),
+            kwargs={"response": Response(), "period": "weekly"},
+        )
+    )
+
+    return targets
+
+
 # Route underlying functions
 
 
@@ -309,6 +371,7 @@ class subgraph_router_builder(router_builder_generalTemplate):
         )
 
     #    hypervisors
+    @cache(expire=APY_CACHE_TIMEOUT)
     async def hypervisors_aggregate_stats(self, response: Response):
         result = aggregate_stats.AggregateStats(
             protocol=self.dex, chain=self.chain, response=response
@@ -573,36 +636,32 @@ class subgraph_router_builder_allDeployments(router_builder_baseTemplate):
 
         return router
 
+    @cache(expire=APY_CACHE_TIMEOUT)
     async def aggregate_stats(
         self,
         response: Response,
     ) -> aggregate_stats.AggregateStatsDeploymentInfoOutput:
-        results = await asyncio.gather(
-            *[
-                aggregate_stats.AggregateStats(
-                    deployment[0], deployment[1], response
-                ).run(RUN_FIRST)
-                for deployment in DEPLOYMENTS
-            ],
-            return_exceptions=True,
-        )
-
-        valid_results = []
-        included_deployments = []
-        for index, result in enumerate(results):
-            if not isinstance(result, Exception):
-                valid_results.append(result)
-                included_deployments.append(
-                    f"{DEPLOYMENTS[index][0]}-{DEPLOYMENTS[index][1]}"
-                )
+        results = await deployments.run_deployments(
+            lambda protocol, chain: aggregate_stats.AggregateStats(
+                protocol, chain, response
+            ).run(RUN_FIRST)
+        )
+        response.headers["Server-Timing"] = deployments.server_timing(results)
 
-        aggregated_results = sum(valid_results[1:], valid_results[0])
+        valid_results = [result for result in results if result.ok]
+
+        aggregated_results = sum(
+            [result.result for result in valid_results],
+            aggregate_stats.AggregateStatsOutput(
+                totalValueLockedUSD=0, pairCount=0, totalFeesClaimedUSD=0
+            ),
+        )
 
         return aggregate_stats.AggregateStatsDeploymentInfoOutput(
             totalValueLockedUSD=aggregated_results.totalValueLockedUSD,
             pairCount=aggregated_results.pairCount,
             totalFeesClaimedUSD=aggregated_results.totalFeesClaimedUSD,
-            deployments=included_deployments,
+            deployments=[result.name for result in valid_results],
         )
 
     async def gamma_basic_stats(self, response: Response):
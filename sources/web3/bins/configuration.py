@@ -49,6 +49,9 @@ WEB3_CHAIN_IDS = {
     "binance": 56,
 }
 
+# documents fetched per database round trip when streaming reads
+DB_BATCH_SIZE = 1000
+
 
 STATIC_REGISTRY_ADDRESSES = {
     "ethereum": {
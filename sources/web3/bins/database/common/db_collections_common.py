@@ -1,13 +1,24 @@
 import logging
 
-from bson.decimal128 import Decimal128, create_decimal128_context
-from decimal import Decimal, localcontext
+from bson.codec_options import CodecOptions
+from bson.decimal128 import Decimal128
+from decimal import Decimal
 from datetime import datetime
-
+from typing import Iterable, Iterator
+
+from sources.common.database.common.codecs import (
+    DECIMAL_CODEC_OPTIONS,
+    from_decimal128,
+    to_decimal128,
+)
+from sources.web3.bins.configuration import DB_BATCH_SIZE
 from sources.web3.bins.database.common.db_managers import MongoDbManager
 
 
 class db_collections_common:
+    # database codec options ( None for pymongo defaults )
+    codec_options: CodecOptions | None = None
+
     def __init__(self, mongo_url: str, db_name: str, db_collections: dict = None):
         if db_collections is None:
             db_collections = {"static": {"id": True}}
@@ -42,6 +53,7 @@ class db_collections_common:
                 url=self._db_mongo_url,
                 db_name=self._db_name,
                 collections=self._db_collections,
+                codec_options=self.codec_options,
             ) as _db_manager:
                 # add to mongodb
                 _db_manager.add_item(
@@ -62,6 +74,7 @@ class db_collections_common:
                 url=self._db_mongo_url,
                 db_name=self._db_name,
                 collections=self._db_collections,
+                codec_options=self.codec_options,
             ) as _db_manager:
                 # add to mongodb
                 _db_manager.replace_item(
@@ -82,6 +95,7 @@ class db_collections_common:
             url=self._db_mongo_url,
             db_name=self._db_name,
             collections=self._db_collections,
+            codec_options=self.codec_options,
         ) as _db_manager:
             result = list(
                 _db_manager.get_items(coll_name=collection_name, aggregate=query)
@@ -93,11 +107,52 @@ class db_collections_common:
             url=self._db_mongo_url,
             db_name=self._db_name,
             collections=self._db_collections,
+            codec_options=self.codec_options,
         ) as _db_manager:
             result = _db_manager.get_items(coll_name=collection_name, **kwargs)
             result = list(result)
         return result
 
+    def iterate_items_from_database(
+        self, collection_name: str, batch_size: int = DB_BATCH_SIZE, **kwargs
+    ) -> Iterator[dict]:
+        """Stream the items of get_items_from_database instead of loading them all
+
+        Args:
+            collection_name (str):
+            batch_size (int): items fetched from the database at a time
+            **kwargs: find, aggregate, projection, sort, limit ... as in get_items_from_database
+
+        Yields:
+            dict: item
+        """
+        with MongoDbManager(
+            url=self._db_mongo_url,
+            db_name=self._db_name,
+            collections=self._db_collections,
+            codec_options=self.codec_options,
+        ) as _db_manager:
+            with _db_manager.get_items(
+                coll_name=collection_name, batch_size=batch_size, **kwargs
+            ) as cursor:
+                yield from cursor
+
+    def iterate_query_items_from_database(
+        self,
+        query: list[dict],
+        collection_name: str,
+        batch_size: int = DB_BATCH_SIZE,
+        projection: dict | None = None,
+    ) -> Iterator[dict]:
+        """Stream the items of query_items_from_database instead of loading them all"""
+        kwargs = {"projection": projection} if projection else {}
+        return self.iterate_items_from_database(
+            collection_name=collection_name,
+            batch_size=batch_size,
+            aggregate=query,
+            **kwargs,
+        )
+
     def get_distinct_items_from_database(
         self, collection_name: str, field: str, condition: dict = None
     ):
@@ -107,6 +162,7 @@ class db_collections_common:
             url=self._db_mongo_url,
             db_name=self._db_name,
             collections=self._db_collections,
+            codec_options=self.codec_options,
         ) as _db_manager:
             result = list(
                 _db_manager.get_distinct(
@@ -115,6 +171,19 @@ class db_collections_common:
             )
         return result
 
+    @staticmethod
+    def fields_projection(fields: Iterable[str]) -> dict:
+        """Projection keeping only the fields a query consumes ( no _id ).
+            Usable as find projection or as the content of a $project stage.
+
+        Args:
+            fields (Iterable[str]): field names, dot notation for embedded ones
+
+        Returns:
+            dict: {"_id": 0, <field>: 1, ...}
+        """
+        return {"_id": 0} | dict.fromkeys(fields, 1)
+
     @staticmethod
     def convert_decimal_to_d128(item: dict) -> dict:
         """Converts a dictionary decimal values to BSON.decimal128, recursivelly.
@@ -137,9 +206,7 @@ class db_collections_common:
                 for l in v:
                     db_collections_common.convert_decimal_to_d128(l)
             elif isinstance(v, Decimal):
-                decimal128_ctx = create_decimal128_context()
-                with localcontext(decimal128_ctx) as ctx:
-                    item[k] = Decimal128(ctx.create_decimal(str(v)))
+                item[k] = to_decimal128(v)
 
         return item
 
@@ -165,7 +232,7 @@ class db_collections_common:
                 for l in v:
                     db_collections_common.convert_d128_to_decimal(l)
             elif isinstance(v, Decimal128):
-                item[k] = v.to_decimal()
+                item[k] = from_decimal128(v)
 
         return item
 
@@ -218,8 +285,18 @@ class database_global(db_collections_common):
     ):
         if db_collections is None:
             db_collections = {
-                "blocks": {"id": True, "network": False, "block": False},
-                "usd_prices": {"id": True, "address": False},
+                "blocks": {
+                    "id": True,
+                    "network": False,
+                    "block": False,
+                    ("network", "block"): False,
+                    ("network", "timestamp"): False,
+                },
+                "usd_prices": {
+                    "id": True,
+                    "address": False,
+                    ("network", "address", "block"): False,
+                },
             }
         super().__init__(
             mongo_url=mongo_url, db_name=db_name, db_collections=db_collections
@@ -463,6 +540,25 @@ class database_local(db_collections_common):
                 }
     """
 
+    # user_status Decimal fields are saved as Decimal128 and read back as Decimal by pymongo
+    codec_options = DECIMAL_CODEC_OPTIONS
+
+    # status fields consumed by query_status_feeReturn_data, pushed down as a $project stage
+    STATUS_FEERETURN_FIELDS = (
+        "block",
+        "timestamp",
+        "totalSupply",
+        "decimals",
+        "totalAmounts.total0",
+        "totalAmounts.total1",
+        "fees_uncollected.qtty_token0",
+        "fees_uncollected.qtty_token1",
+        "tvl.fees_owed_token0",
+        "tvl.fees_owed_token1",
+        "pool.token0.decimals",
+        "pool.token1.decimals",
+    )
+
     def __init__(self, mongo_url: str, db_name: str, db_collections: dict = None):
         if db_collections is None:
             db_collections = {
@@ -472,12 +568,16 @@ class database_local(db_collections_common):
                     "blockNumber": False,
                     "address": False,
                     "timestamp": False,
+                    ("address", "blockNumber", "logIndex"): False,
+                    ("address", "timestamp"): False,
                 },
                 "status": {
                     "id": True,
                     "block": False,
                     "address": False,
                     "timestamp": False,
+                    ("address", "block"): False,
+                    ("address", "timestamp"): False,
                 },
                 "user_status": {
                     "id": True,
@@ -485,6 +585,9 @@ class database_local(db_collections_common):
                     "address": False,
                     "hypervisor_address": False,
                     "timestamp": False,
+                    ("address", "block"): False,
+                    ("hypervisor_address", "block"): False,
+                    ("hypervisor_address", "address", "block", "logIndex"): False,
                 },
                 "rewards_static": {"id": True, "address": False},
             }
@@ -725,6 +828,22 @@ class database_local(db_collections_common):
             ),
         )
 
+    def iterate_status_feeReturn_data(
+        self,
+        hypervisor_address: str,
+        timestamp_ini: int,
+        timestamp_end: int,
+    ) -> Iterator[dict]:
+        """Stream get_status_feeReturn_data items"""
+        return self.iterate_query_items_from_database(
+            collection_name="status",
+            query=self.query_status_feeReturn_data(
+                hypervisor_address=hypervisor_address,
+                timestamp_ini=timestamp_ini,
+                timestamp_end=timestamp_end,
+            ),
+        )
+
     def get_status_feeReturn_data_alternative(
         self,
         hypervisor_address: str,
@@ -740,6 +859,22 @@ class database_local(db_collections_common):
             ),
         )
 
+    def iterate_status_feeReturn_data_alternative(
+        self,
+        hypervisor_address: str,
+        timestamp_ini: int,
+        timestamp_end: int,
+    ) -> Iterator[dict]:
+        """Stream get_status_feeReturn_data_alternative items"""
+        return self.iterate_query_items_from_database(
+            collection_name="status",
+            query=self.query_status_feeReturn_data_alternative(
+                hypervisor_address=hypervisor_address,
+                timestamp_ini=timestamp_ini,
+                timestamp_end=timestamp_end,
+            ),
+        )
+
     # user status
 
     def set_user_status(self, data: dict):
@@ -753,21 +888,18 @@ class database_local(db_collections_common):
             "id"
         ] = f"{data['address']}_{data['block']}_{data['logIndex']}_{data['hypervisor_address']}"
 
-        # convert decimal to bson compatible and save
+        # Decimal is saved as Decimal128 by the database codec
         self.replace_item_to_database(data=data, collection_name="user_status")
 
     def get_user_status(
         self, address: str, block_ini: int = 0, block_end: int = 0
     ) -> list:
-        # convert bson to Decimal
+        # bson Decimal128 is read as Decimal by the database codec
         find = {"address": address}
         sort = [("block", 1)]
-        return [
-            self.convert_d128_to_decimal(item=item)
-            for item in self.get_items_from_database(
-                collection_name="user_status", find=find, sort=sort
-            )
-        ]
+        return self.get_items_from_database(
+            collection_name="user_status", find=find, sort=sort
+        )
 
     # rewards_static
 
@@ -1057,6 +1189,11 @@ class database_local(db_collections_common):
                     ],
                 }
             },
+            {
+                "$project": database_local.fields_projection(
+                    database_local.STATUS_FEERETURN_FIELDS
+                )
+            },
             {"$sort": {"block": 1}},
             {
                 "$group": {
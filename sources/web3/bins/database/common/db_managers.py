@@ -1,9 +1,16 @@
-from pymongo import MongoClient
+from bson.codec_options import CodecOptions
+from pymongo import ASCENDING, MongoClient
 from pymongo.errors import ConnectionFailure
 
 
 class MongoDbManager:
-    def __init__(self, url: str, db_name: str, collections: dict):
+    def __init__(
+        self,
+        url: str,
+        db_name: str,
+        collections: dict,
+        codec_options: CodecOptions | None = None,
+    ):
         """Mongo database helper
 
         Args:
@@ -18,6 +25,7 @@ class MongoDbManager:
                                        {"id":True
                                        },
                                }
+           codec_options (CodecOptions, optional): database codec options, like DECIMAL_CODEC_OPTIONS
         """
 
         # connect to mongo database
@@ -25,7 +33,9 @@ class MongoDbManager:
             self.mongo_client = MongoClient(url)
         except ConnectionFailure as e:
             raise ValueError(f"Failed not connect to {url}") from e
-        self.database = self.mongo_client[db_name]
+        self.database = self.mongo_client.get_database(
+            db_name, codec_options=codec_options
+        )
 
         # Retrieve database collection names
         self.database_collections = self.database.list_collection_names()
@@ -46,18 +56,30 @@ class MongoDbManager:
     def configure_collections(self):
         """define collection names and create indexes"""
         for coll_name, fields in self.collections_config.items():
-            for field, unique in fields.items():
-                self.database[coll_name].create_index(field, unique=unique)
+            self.create_indexes(coll_name=coll_name, indexes=fields)
+
+    def create_indexes(self, coll_name: str, indexes: dict):
+        """Create collection indexes
+        Arguments:
+           indexes = { <collection field name or tuple of field names>:str|tuple : <unique>:bool }
+                      tuples of field names create ascending compound indexes
+        """
+        for field, unique in indexes.items():
+            self.database[coll_name].create_index(
+                [(name, ASCENDING) for name in field]
+                if isinstance(field, tuple)
+                else field,
+                unique=unique,
+            )
 
-    def create_collection(self, coll_name: str, **indexes):
+    def create_collection(self, coll_name: str, indexes: dict):
         """Creates a collection if it does not exist.
         Arguments:
-           indexes = [ <collection field name>:str = <unique>:bool  ]
+           indexes = { <collection field name or tuple of field names>:str|tuple : <unique>:bool }
         """
 
         if coll_name not in self.database_collections:
-            for field, unique in indexes.items():
-                self.database[coll_name].create_index(field, unique=unique)
+            self.create_indexes(coll_name=coll_name, indexes=indexes)
 
             # refresh database collection names
             self.database_collections = self.database.list_collection_names()
@@ -82,7 +104,7 @@ class MongoDbManager:
             )
         # create collection if it does not exist yet
         self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
+            coll_name=coll_name, indexes=self.collections_config[coll_name]
         )
 
         # add/ update to database (add or replace)
@@ -110,7 +132,7 @@ class MongoDbManager:
             )
         # create collection if it does not exist yet
         self.create_collection(
-            coll_name=coll_name, **self.collections_config[coll_name]
+            coll_name=coll_name, indexes=self.collections_config[coll_name]
         )
 
         # add/ update to database (add or replace)
@@ -146,6 +168,8 @@ class MongoDbManager:
                                                        }
                                                }]
                                    allowDiskUse=<bool>
+                                   projection=  ( added as a final $project stage )
+                                   batch_size=100
         """
 
         # when no argunments, return all
@@ -256,12 +280,16 @@ class MongoDbManager:
                 return self.database[coll_name].find(kwargs["find"])
 
         elif "aggregate" in kwargs:
+            pipeline = kwargs["aggregate"]
+            if "projection" in kwargs:
+                # only return the projected fields
+                pipeline = [*pipeline, {"$project": kwargs["projection"]}]
+            options = {}
             if "allowDiskUse" in kwargs:
-                return self.database[coll_name].aggregate(
-                    kwargs["aggregate"], allowDiskUse=kwargs["allowDiskUse"]
-                )
-            else:
-                return self.database[coll_name].aggregate(kwargs["aggregate"])
+                options["allowDiskUse"] = kwargs["allowDiskUse"]
+            if "batch_size" in kwargs:
+                options["batchSize"] = kwargs["batch_size"]
+            return self.database[coll_name].aggregate(pipeline, **options)
 
     def get_distinct(self, coll_name: str, field: str, condition: dict = None):
         """get distinct items of a database field
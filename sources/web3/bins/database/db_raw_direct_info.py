@@ -61,10 +61,11 @@ class direct_db_hypervisor_info:
         ]
         find = {"$or": or_query, "network": self.network}
         sort = [("block", 1)]
+        projection = {"_id": 0, "block": 1, "address": 1, "price": 1}
 
         result = {}
-        for x in global_db_manager.get_items_from_database(
-            collection_name="usd_prices", find=find, sort=sort
+        for x in global_db_manager.iterate_items_from_database(
+            collection_name="usd_prices", find=find, sort=sort, projection=projection
         ):
             if x["block"] not in result:
                 result[x["block"]] = {}
@@ -891,14 +892,13 @@ class direct_db_hypervisor_info:
     def get_feeReturn(self, ini_date: datetime, end_date: datetime) -> tuple:
         timestamp_ini = ini_date.timestamp()
         timestamp_end = end_date.timestamp()
-        status_list = [
-            self.local_db_manager.convert_d128_to_decimal(x)
-            for x in self.local_db_manager.get_status_feeReturn_data(
-                hypervisor_address=self.address,
-                timestamp_ini=timestamp_ini,
-                timestamp_end=timestamp_end,
-            )
-        ]
+        # streamed from database: one status in memory at a time
+        # ( Decimal128 is read as Decimal by the database codec )
+        status_list = self.local_db_manager.iterate_status_feeReturn_data(
+            hypervisor_address=self.address,
+            timestamp_ini=timestamp_ini,
+            timestamp_end=timestamp_end,
+        )
 
         day_in_seconds = Decimal("60") * Decimal("60") * Decimal("24")
         year_in_seconds = day_in_seconds * Decimal("365")
@@ -975,14 +975,12 @@ class direct_db_hypervisor_info:
     def get_feeReturn_and_IL_v1(self, ini_date: datetime, end_date: datetime) -> tuple:
         timestamp_ini = ini_date.timestamp()
         timestamp_end = end_date.timestamp()
-        status_list = [
-            self.local_db_manager.convert_d128_to_decimal(x)
-            for x in self.local_db_manager.get_status_feeReturn_data(
-                hypervisor_address=self.address,
-                timestamp_ini=timestamp_ini,
-                timestamp_end=timestamp_end,
-            )
-        ]
+        # Decimal128 is read as Decimal by the database codec
+        status_list = self.local_db_manager.get_status_feeReturn_data(
+            hypervisor_address=self.address,
+            timestamp_ini=timestamp_ini,
+            timestamp_end=timestamp_end,
+        )
 
         day_in_seconds = Decimal("60") * Decimal("60") * Decimal("24")
         year_in_seconds = day_in_seconds * Decimal("365")
@@ -1189,20 +1187,15 @@ class direct_db_hypervisor_info:
         timestamp_ini = ini_date.timestamp()
         timestamp_end = end_date.timestamp()
 
-        status_list = [
+        # streamed from database: only the resulting statuses are kept in memory
+        status_list = (
             convert_hypervisor_fromDict(hypervisor=x, toDecimal=True)
-            for x in self.local_db_manager.get_status_feeReturn_data_alternative(
+            for x in self.local_db_manager.iterate_status_feeReturn_data_alternative(
                 hypervisor_address=self.address,
                 timestamp_ini=timestamp_ini,
                 timestamp_end=timestamp_end,
             )
-        ]
-
-        # more than 1 result is needed to calc anything
-        if len(status_list) < 2:
-            raise ValueError(
-                f" Insuficient data returned for {self.network}'s {self.address} to calculate returns from timestamp {timestamp_ini} to {timestamp_end}"
-            )
+        )
 
         day_in_seconds = Decimal("60") * Decimal("60") * Decimal("24")
         year_in_seconds = day_in_seconds * Decimal("365")
@@ -1231,6 +1224,7 @@ class direct_db_hypervisor_info:
 
         last_status = None
         result = list()
+        idx = -1
         for idx, status in enumerate(status_list):
             # set time zero
             if (
@@ -1530,6 +1524,12 @@ class direct_db_hypervisor_info:
                 # set last status to be used on next iteration
                 last_status = status
 
+        # more than 1 result is needed to calc anything
+        if idx < 1:
+            raise ValueError(
+                f" Insuficient data returned for {self.network}'s {self.address} to calculate returns from timestamp {timestamp_ini} to {timestamp_end}"
+            )
+
         # DEBUG: should match last item
         # cum_fee_return -= 1
         # fee_apr = cum_fee_return * (year_in_seconds / total_period_seconds)
@@ -7,6 +7,7 @@ import concurrent.futures
 from bson.decimal128 import Decimal128
 from decimal import Decimal, getcontext
 from datetime import datetime, timedelta
+from typing import Iterator
 
 from sources.web3.bins.configuration import CONFIGURATION
 from sources.web3.bins.general.general_utilities import log_execution_time
@@ -355,10 +356,11 @@ class user_status_hypervisor_builder:
         ]
         find = {"$or": or_query, "network": self.network}
         sort = [("block", 1)]
+        projection = {"_id": 0, "block": 1, "address": 1, "price": 1}
 
         result = {}
-        for x in global_db_manager.get_items_from_database(
-            collection_name="usd_prices", find=find, sort=sort
+        for x in global_db_manager.iterate_items_from_database(
+            collection_name="usd_prices", find=find, sort=sort, projection=projection
         ):
             if x["block"] not in result:
                 result[x["block"]] = {}
@@ -639,10 +641,8 @@ class user_status_hypervisor_builder:
             db_result = self.local_db_manager.get_items_from_database(
                 collection_name="user_status", aggregate=query
             )[0]
-            # convert to decimals and return
-            return self.local_db_manager.convert_d128_to_decimal(db_result)[
-                "shares_qtty"
-            ]
+            # decimals are decoded by the database codec
+            return db_result["shares_qtty"]
         except IndexError:
             if not exclude_address:
                 logging.getLogger(__name__).exception(
@@ -884,7 +884,7 @@ class user_status_hypervisor_builder:
         # get all available hypervisor operations, not already processed:  the hypervisor status at any time T needs all operations till that time to be build
         result = [
             operation
-            for operation in self.get_hypervisor_operations()
+            for operation in self.iterate_hypervisor_operations()
             if operation["blockNumber"] not in user_status_blocks_processed
         ]
 
@@ -1977,12 +1977,24 @@ class user_status_hypervisor_builder:
             list[dict]:
         """
 
+        return list(self.iterate_hypervisor_operations(block=block))
+
+    def iterate_hypervisor_operations(self, block: int = 0) -> Iterator[dict]:
+        """Stream all found hypervisor operations ordered by block (asc)
+
+        Args:
+            block (int, optional): . Defaults to 0.
+
+        Yields:
+            dict: operation
+        """
+
         find = {"address": self.address.lower()}
         if block != 0:
             find["blockNumber"] = block
         sort = [("blockNumber", 1), ("logIndex", 1)]
 
-        return self.local_db_manager.get_items_from_database(
+        return self.local_db_manager.iterate_items_from_database(
             collection_name="operations", find=find, sort=sort
         )
 
@@ -2014,7 +2026,7 @@ class user_status_hypervisor_builder:
         """Get a list of status separated by days
             sorted by date from past to present
         Returns:
-            list[int]:
+            list[dict]: status with only block, timestamp and decimals fields
         """
 
         # get a list of status blocks separated at least by 1 hour
@@ -2024,6 +2036,16 @@ class user_status_hypervisor_builder:
                     "address": self.address,
                 }
             },
+            # only the fields used to build report operations
+            {
+                "$project": {
+                    "block": 1,
+                    "timestamp": 1,
+                    "decimals": 1,
+                    "pool.token0.decimals": 1,
+                    "pool.token1.decimals": 1,
+                }
+            },
             {
                 "$addFields": {
                     "datetime": {"$toDate": {"$multiply": ["$timestamp", 1000]}}
@@ -2043,7 +2065,7 @@ class user_status_hypervisor_builder:
         ]
         return [
             x["status"]
-            for x in self.local_db_manager.query_items_from_database(
+            for x in self.local_db_manager.iterate_query_items_from_database(
                 collection_name="status", query=query
             )
         ]
@@ -2110,12 +2132,8 @@ class user_status_hypervisor_builder:
         Returns:
             dict:
         """
-        # convert to dictionary
-        result = self.convert_user_status_to_dict(status=status)
-        # convert decimal to decimal128
-        result = self.local_db_manager.convert_decimal_to_d128(item=result)
-        # return
-        return result
+        # convert to dictionary ( Decimal is saved as Decimal128 by the database codec )
+        return self.convert_user_status_to_dict(status=status)
 
     def convert_user_status_fromDb(self, status: dict) -> user_status:
         """convert database dict type to user_status
@@ -2126,12 +2144,8 @@ class user_status_hypervisor_builder:
         Returns:
             dict:
         """
-        # convert to decimal
-        result = self.local_db_manager.convert_d128_to_decimal(item=status)
-        # convert to dictionary
-        result = self.convert_user_status_from_dict(status=result)
-        # return
-        return result
+        # convert to dictionary ( Decimal128 is read as Decimal by the database codec )
+        return self.convert_user_status_from_dict(status=status)
 
     def convert_user_status_to_dict(self, status: user_status) -> dict:
         fields_excluded = []
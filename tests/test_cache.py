@@ -0,0 +1,84 @@
+"""Stale-while-revalidate endpoint cache"""
+import asyncio
+import time
+
+import endpoint.cache
+from endpoint.cache import CacheEntry, MemoryCacheBackend, StaleWhileRevalidateCache
+
+EXPIRE = 10
+MAX_STALE = 60
+
+
+class LeasedBackend(MemoryCacheBackend):
+    """Memory backend whose refresh lease can be held by another worker"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.leased = False
+
+    async def acquire(self, key: str, lease: int) -> bool:
+        # like the SQLite backend, let other requests run meanwhile
+        await asyncio.sleep(0)
+        return not self.leased
+
+
+def stale_entry() -> CacheEntry:
+    entry = CacheEntry.from_body(b'"stale"', EXPIRE, MAX_STALE)
+    entry.created -= EXPIRE + 1
+    return entry
+
+
+def counting_func(calls: list):
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return "fresh"
+
+    return func
+
+
+def test_miss_after_stale_hit_with_lease_held_elsewhere(monkeypatch):
+    """A miss does not get the None of a background refresh that gave up"""
+    monkeypatch.setattr(endpoint.cache, "LEASE_POLL_INTERVAL", 0.01)
+
+    async def run():
+        backend = LeasedBackend()
+        cache = StaleWhileRevalidateCache(backend)
+        calls = []
+        func = counting_func(calls)
+        await backend.set("key", stale_entry())
+        backend.leased = True
+
+        stale = await cache.get("name", "key", func, EXPIRE, MAX_STALE)
+        # the entry is gone before the other worker releases the lease
+        backend._entries.clear()
+        missed = asyncio.create_task(cache.get("name", "key", func, EXPIRE, MAX_STALE))
+        await asyncio.sleep(0.05)
+        backend.leased = False
+        return stale, await missed, calls
+
+    stale, missed, calls = asyncio.run(run())
+    assert stale.body == b'"stale"'
+    assert isinstance(missed, CacheEntry)
+    assert missed.body == b'"fresh"'
+    assert len(calls) == 1
+
+
+def test_miss_after_stale_hit_shares_the_refresh():
+    async def run():
+        backend = LeasedBackend()
+        cache = StaleWhileRevalidateCache(backend)
+        calls = []
+        func = counting_func(calls)
+        await backend.set("key", stale_entry())
+
+        stale = await cache.get("name", "key", func, EXPIRE, MAX_STALE)
+        backend._entries.clear()
+        missed = await cache.get("name", "key", func, EXPIRE, MAX_STALE)
+        return stale, missed, calls, cache
+
+    stale, missed, calls, cache = asyncio.run(run())
+    assert stale.body == b'"stale"'
+    assert missed.body == b'"fresh"'
+    assert len(calls) == 1
+    assert not cache._refreshing
@@ -0,0 +1,90 @@
+"""Decimal <-> Decimal128 conversions of the pymongo Decimal codec"""
+from decimal import Decimal
+
+import bson
+import pytest
+from bson.decimal128 import Decimal128
+
+from sources.common.database.common.codecs import (
+    DECIMAL128_CONTEXT,
+    DECIMAL_CODEC_OPTIONS,
+    from_decimal128,
+    to_decimal128,
+)
+
+VALUES = [
+    "0",
+    "-0",
+    "0E-6176",
+    "-0E+6111",
+    "1",
+    "-1",
+    "0.1",
+    "12.123456789012345678",
+    "-987654321.0123456789",
+    "1E+18",
+    "115792089237316195423570985008687907853269984665640564039457584007913129639935",
+    # 34 digits
+    "1234567890123456789012345678901234",
+    "-9999999999999999999999999999999999",
+    "0.1234567890123456789012345678901234",
+    "9999999999999999999999999999999999E+6111",
+    # more than 34 digits: rounded half even
+    "12345678901234567890123456789012345",
+    "1234567890123456789012345678901234.5",
+    "1234567890123456789012345678901235.5",
+    "-0.12345678901234567890123456789012345678",
+    # exponent bounds
+    "1E+6111",
+    "1E+6144",
+    "-1E+6144",
+    "1E-6143",
+    "1E-6176",
+    "-1E-6176",
+    "1234567890123456789012345678901234E-6176",
+    "1E-6177",
+    "5E-6177",
+    "6E-6177",
+    # special values
+    "Infinity",
+    "-Infinity",
+    "NaN",
+    "-NaN",
+]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_to_decimal128(value: str):
+    expected = Decimal128(DECIMAL128_CONTEXT.create_decimal(Decimal(value)))
+    assert to_decimal128(Decimal(value)).bid == expected.bid
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_from_decimal128(value: str):
+    d128 = Decimal128(DECIMAL128_CONTEXT.create_decimal(Decimal(value)))
+    result = from_decimal128(d128)
+    expected = d128.to_decimal()
+    if expected.is_nan():
+        assert result.is_nan() and result.is_signed() == expected.is_signed()
+    else:
+        assert str(result) == str(expected)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_codec_round_trip(value: str):
+    document = {"value": Decimal(value), "nested": [{"value": Decimal(value)}]}
+    encoded = bson.encode(document, codec_options=DECIMAL_CODEC_OPTIONS)
+    # same bytes as Decimal128 values built by bson
+    d128 = Decimal128(DECIMAL128_CONTEXT.create_decimal(Decimal(value)))
+    assert encoded == bson.encode({"value": d128, "nested": [{"value": d128}]})
+
+    decoded = bson.decode(encoded, codec_options=DECIMAL_CODEC_OPTIONS)
+    result = decoded["value"]
+    assert isinstance(result, Decimal)
+    assert decoded["nested"][0]["value"].compare_total(result) == 0
+    if result.is_nan():
+        assert Decimal(value).is_nan()
+    else:
+        # same value, exponent and sign ( zeros included ) as the rounded Decimal
+        expected = DECIMAL128_CONTEXT.create_decimal(Decimal(value))
+        assert result.compare_total(expected) == 0
@@ -0,0 +1,216 @@
+"""Parity of FeesYield.calculate_returns with the DataFrame implementation it replaced"""
+import math
+import random
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from sources.subgraph.bins.constants import DAY_SECONDS, YEAR_SECONDS
+from sources.subgraph.bins.enums import Chain, Protocol
+from sources.subgraph.bins.hype_fees.fees import Fees
+from sources.subgraph.bins.hype_fees.fees_yield import YIELD_PER_DAY_MAX, FeesYield
+from sources.subgraph.bins.hype_fees.schema import FeesData, FeesSnapshot, FeeYield
+
+APR_TYPES = [None, "users", "gamma", "all"]
+STATUSES = {"Good", "Outlier removed", "Insufficient Data", "Insufficient good data"}
+
+
+def reference_calculate_returns(
+    data: list[FeesData], apr_type: str | None = None
+) -> FeeYield:
+    """FeesYield.calculate_returns as it was: one DataFrame per hypervisor"""
+    apr_type = apr_type or "users"
+
+    snapshots = []
+    for fees_data in data:
+        fee_amounts = Fees(fees_data, Protocol.UNISWAP, Chain.MAINNET).fee_amounts()
+        snapshots.append(
+            FeesSnapshot(
+                block=fees_data.block,
+                timestamp=fees_data.timestamp,
+                fee=fees_data.fee,
+                tvl_usd=fees_data.tvl_usd,
+                total_fees_0=fee_amounts.total.amount.value0,
+                total_fees_1=fee_amounts.total.amount.value1,
+                price_0=fees_data.price.value0,
+                price_1=fees_data.price.value1,
+            )
+        )
+    df_snapshots = DataFrame(snapshots, dtype=np.float64)
+
+    if len(df_snapshots) < 2:
+        return FeeYield(apr=0, apy=0, status="Insufficient Data")
+
+    df_snapshots = df_snapshots.set_index("block").sort_index()
+    df_snapshots["fee_calc"] = df_snapshots["fee"].apply(
+        lambda x: 1 / x if x < 100 else 1 / 10
+    )
+    df_snapshots["gamma_fee_0"] = df_snapshots.total_fees_0 * df_snapshots.fee_calc
+    df_snapshots["gamma_fee_1"] = df_snapshots.total_fees_1 * df_snapshots.fee_calc
+    df_snapshots["lp_fee_0"] = df_snapshots.total_fees_0 - df_snapshots.gamma_fee_0
+    df_snapshots["lp_fee_1"] = df_snapshots.total_fees_1 - df_snapshots.gamma_fee_1
+
+    df_snapshots["elapsed_time"] = df_snapshots.timestamp.diff()
+
+    if apr_type == "users":
+        df_snapshots["fee0_growth"] = df_snapshots.lp_fee_0.diff().clip(lower=0)
+        df_snapshots["fee1_growth"] = df_snapshots.lp_fee_1.diff().clip(lower=0)
+    elif apr_type == "gamma":
+        df_snapshots["fee0_growth"] = df_snapshots.gamma_fee_0.diff().clip(lower=0)
+        df_snapshots["fee1_growth"] = df_snapshots.gamma_fee_1.diff().clip(lower=0)
+    elif apr_type == "all":
+        df_snapshots["fee0_growth"] = df_snapshots.total_fees_0.diff().clip(lower=0)
+        df_snapshots["fee1_growth"] = df_snapshots.total_fees_1.diff().clip(lower=0)
+
+    df_snapshots["fee_growth_usd"] = (
+        df_snapshots.fee0_growth * df_snapshots.price_0
+        + df_snapshots.fee1_growth * df_snapshots.price_1
+    )
+    df_snapshots["period_yield"] = df_snapshots.fee_growth_usd / df_snapshots.tvl_usd
+    df_snapshots["yield_per_day"] = (
+        df_snapshots.period_yield * YEAR_SECONDS / df_snapshots.elapsed_time
+    )
+
+    has_outlier = (df_snapshots.yield_per_day > YIELD_PER_DAY_MAX).any()
+    df_snapshots = df_snapshots[df_snapshots.yield_per_day < YIELD_PER_DAY_MAX]
+
+    df_snapshots["total_period_seconds"] = df_snapshots.elapsed_time.cumsum()
+    df_snapshots["cum_fee_return"] = (1 + df_snapshots.period_yield).cumprod() - 1
+
+    df_returns = df_snapshots[["total_period_seconds", "cum_fee_return"]].tail(1)
+
+    if df_returns.empty:
+        return FeeYield(apr=0, apy=0, status="Insufficient good data")
+
+    df_returns["fee_apr"] = df_returns.cum_fee_return * (
+        YEAR_SECONDS / df_returns.total_period_seconds
+    )
+    df_returns["fee_apy"] = (
+        1 + df_returns.cum_fee_return * (DAY_SECONDS / df_returns.total_period_seconds)
+    ) ** 365 - 1
+
+    df_returns = df_returns.fillna(0).replace({np.inf: 0, -np.inf: 0})
+
+    returns = df_returns.to_dict("records")[0]
+    returns["fee_apr"] = max(returns["fee_apr"], 0)
+    returns["fee_apy"] = max(returns["fee_apy"], 0)
+
+    return FeeYield(
+        apr=returns["fee_apr"] if returns["fee_apr"] else 0,
+        apy=returns["fee_apy"] if returns["fee_apy"] else 0,
+        status="Outlier removed" if has_outlier else "Good",
+    )
+
+
+def _position(rng: random.Random, name: str, growth0: int, growth1: int) -> dict:
+    """Position fields of a FeesData row, in range of tick 0,
+    with fee growth outside its ticks lower than the global fee growth"""
+    lower = rng.choice([-100, -10])
+    return {
+        f"liquidity_{name}": rng.choice([0, 10**17, 10**18]),
+        f"tokens_owed_{name}0": rng.choice([0, rng.randrange(10**15)]),
+        f"tokens_owed_{name}1": rng.choice([0, rng.randrange(10**3)]),
+        f"fee_growth_inside_{name}0": rng.randrange(growth0 // 8),
+        f"fee_growth_inside_{name}1": rng.randrange(growth1 // 8),
+        f"tick_index_lower_{name}": lower,
+        f"fee_growth_outside_lower_{name}0": rng.randrange(growth0 // 4),
+        f"fee_growth_outside_lower_{name}1": rng.randrange(growth1 // 4),
+        f"tick_index_upper_{name}": lower + rng.choice([120, 200]),
+        f"fee_growth_outside_upper_{name}0": rng.randrange(growth0 // 4),
+        f"fee_growth_outside_upper_{name}1": rng.randrange(growth1 // 4),
+    }
+
+
+def random_snapshots(rng: random.Random, count: int) -> list[FeesData]:
+    """Snapshots of one hypervisor, unsorted, with repeated timestamps,
+    zero or negative tvl, fee growth drops and jumps that end up as outliers"""
+    fee = rng.choices([1, 10, 20, 150], weights=[1, 6, 2, 1])[0]
+    growth = rng.randrange(2**126, 2**127)
+    positions = _position(rng, "base", growth, growth // 10**9) | _position(
+        rng, "limit", growth, growth // 10**9
+    )
+    timestamp = 1_600_000_000
+    snapshots = []
+    for block in sorted(rng.sample(range(10**7), count)):
+        growth += rng.choice(
+            [
+                0,
+                rng.randrange(2**124),
+                rng.randrange(2**124),
+                -rng.randrange(2**118),
+            ]
+        )
+        if rng.random() < 0.05:
+            # outlier: fee growth jump
+            growth += rng.randrange(2**134, 2**136)
+        timestamp += rng.choice([0, 12, 3600, 3600, 43200, 86400])
+        snapshots.append(
+            FeesData(
+                block=block,
+                timestamp=timestamp,
+                hypervisor="0xhypervisor",
+                symbol="TKA-TKB",
+                current_tick=0,
+                fee=fee,
+                price0=rng.choices([0, 0.7, 1850.25], weights=[1, 4, 15])[0],
+                price1=rng.choice([1, 0.0004]),
+                decimals0=18,
+                decimals1=6,
+                tvl0=10**18,
+                tvl1=10**6,
+                tvl_usd=rng.choices([0, -5, 1e5, 1e6], weights=[1, 1, 4, 34])[0],
+                fee_growth_global0=growth,
+                fee_growth_global1=growth // 10**9,
+                **positions,
+            )
+        )
+    rng.shuffle(snapshots)
+    return snapshots
+
+
+def assert_same_returns(result: FeeYield, expected: FeeYield):
+    assert result.status == expected.status
+    assert math.isclose(result.apr, expected.apr, rel_tol=1e-9, abs_tol=1e-12)
+    assert math.isclose(result.apy, expected.apy, rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("apr_type", APR_TYPES)
+@pytest.mark.parametrize("seed", range(20))
+def test_calculate_returns_parity(seed: int, apr_type: str | None):
+    rng = random.Random(seed)
+    for count in (0, 1, 2, 3, 5, 20, 60):
+        snapshots = random_snapshots(rng, count)
+        assert_same_returns(
+            FeesYield(snapshots, Protocol.UNISWAP, Chain.MAINNET).calculate_returns(
+                apr_type
+            ),
+            reference_calculate_returns(snapshots, apr_type),
+        )
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_parity_cases_cover_every_status():
+    """The randomized snapshot sets reach every FeeYield status,
+    with non zero returns for the good ones"""
+    statuses = set()
+    for seed in range(20):
+        rng = random.Random(seed)
+        for count in (0, 1, 2, 3, 5, 20, 60):
+            returns = reference_calculate_returns(random_snapshots(rng, count))
+            statuses.add(returns.status)
+            if returns.apr > 0:
+                statuses.add(f"{returns.status} apr > 0")
+    assert statuses == STATUSES | {"Good apr > 0", "Outlier removed apr > 0"}
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("apr_type", APR_TYPES)
+def test_single_snapshot(apr_type: str | None):
+    snapshots = random_snapshots(random.Random(0), 1)
+    result = FeesYield(snapshots, Protocol.UNISWAP, Chain.MAINNET).calculate_returns(
+        apr_type
+    )
+    assert result == FeeYield(apr=0, apy=0, status="Insufficient Data")
+    assert_same_returns(result, reference_calculate_returns(snapshots, apr_type))
@@ -0,0 +1,73 @@
+"""db_returns_manager.feed_db writes to the returns and latest_returns collections"""
+import asyncio
+
+import pytest
+
+import sources.subgraph.bins.database.managers as managers
+from sources.subgraph.bins.database.managers import db_returns_manager
+from sources.subgraph.bins.enums import Chain, Protocol
+
+
+class FakeReturnsManager(db_returns_manager):
+    """Returns manager over an in memory returns collection"""
+
+    def __init__(self, saved_ids: set[str], failing_updates: int = 0) -> None:
+        super().__init__(mongo_url="mongodb://test")
+        self.saved_ids = saved_ids
+        self.failing_updates = failing_updates
+        self.applied: list[str] = []
+
+    async def create_data(self, chain, protocol, period_days, current_timestamp=None):
+        return {
+            f"{address}_{period_days}": {"id": f"{address}_{period_days}"}
+            for address in ("0xa", "0xb")
+        }
+
+    async def get_distinct_items_from_database(self, field, collection_name, condition):
+        return [id for id in condition["id"]["$in"] if id in self.saved_ids]
+
+    async def save_items_to_database(self, data, collection_name):
+        self.saved_ids |= set(data)
+        return 0
+
+    async def update_latest_returns(self, chain, protocol, returns):
+        if self.failing_updates:
+            self.failing_updates -= 1
+            raise ValueError("static read failed")
+        self.applied += [item["id"] for item in returns]
+        return 0
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch):
+    async def sleep(seconds):
+        pass
+
+    monkeypatch.setattr(managers.asyncio, "sleep", sleep)
+
+
+def feed(manager: FakeReturnsManager):
+    asyncio.run(
+        manager.feed_db(chain=Chain.MAINNET, protocol=Protocol.UNISWAP, periods=[1, 7])
+    )
+
+
+def test_only_new_items_update_latest_returns():
+    manager = FakeReturnsManager(saved_ids={"0xa_1"})
+    feed(manager)
+    assert sorted(manager.applied) == ["0xa_7", "0xb_1", "0xb_7"]
+
+
+def test_retry_after_saving_still_updates_latest_returns():
+    manager = FakeReturnsManager(saved_ids={"0xa_1"}, failing_updates=1)
+    feed(manager)
+    assert sorted(manager.applied) == ["0xa_7", "0xb_1", "0xb_7"]
+
+
+def test_failed_latest_returns_operations_are_logged(caplog):
+    class PartialManager(FakeReturnsManager):
+        async def update_latest_returns(self, chain, protocol, returns):
+            return 2
+
+    feed(PartialManager(saved_ids=set()))
+    assert "2 latest_returns operations" in caplog.text